@@ -1,6 +1,9 @@
 from django.apps import AppConfig
 
 
-class ExamsConfig(AppConfig):
+class CoursesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'exams'
+    name = 'courses'
+
+    def ready(self):
+        from . import signals  # noqa: F401
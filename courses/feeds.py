@@ -0,0 +1,50 @@
+"""
+Cached announcement feeds.
+
+Each audience's feed is cached under a key that embeds a shared version
+number. Saving or deleting an announcement bumps the version (see
+courses/signals.py), so every cached feed is replaced on its next read
+without having to know which keys exist. The version only reaches other
+server processes through a shared cache backend (see CACHES in settings.py).
+"""
+from django.core.cache import cache
+
+from se302_project.conf import app_setting
+from .models import Announcement
+
+VERSION_KEY = 'announcements:version'
+
+AUDIENCE_QUERIES = {
+    # Students see every announcement.
+    'all': lambda: Announcement.objects.all(),
+    # Instructors see announcements posted by faculty.
+    'faculty': lambda: Announcement.objects.filter(posted_by__groups__name='faculty'),
+}
+
+
+def get_feed_version():
+    return cache.get_or_set(VERSION_KEY, 1, timeout=None)
+
+
+def invalidate_feeds():
+    cache.add(VERSION_KEY, 1, timeout=None)
+    cache.incr(VERSION_KEY)
+
+
+def get_announcement_feed(audience, limit=None):
+    """Return the newest `limit` announcements for the audience ('all' or 'faculty')."""
+    if limit is None:
+        limit = app_setting('ANNOUNCEMENT_FEED', 'PAGE_SIZE')
+    key = f'announcements:{audience}:{limit}:v{get_feed_version()}'
+
+    announcements = cache.get(key)
+    if announcements is None:
+        queryset = AUDIENCE_QUERIES[audience]().order_by('-created_at', '-id')
+        announcements = list(queryset[:limit])
+        cache.set(key, announcements, timeout=app_setting('ANNOUNCEMENT_FEED', 'TIMEOUT'))
+    return announcements
+
+
+def get_dashboard_feed(audience):
+    """The short feed shown on the student and instructor dashboards."""
+    return get_announcement_feed(audience, limit=app_setting('ANNOUNCEMENT_FEED', 'DASHBOARD_SIZE'))
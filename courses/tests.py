@@ -1,3 +1,58 @@
-from django.test import TestCase
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .feeds import get_announcement_feed
+from .models import Announcement
+
+
+class AnnouncementFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.faculty = User.objects.create_user(username='faculty', password='facultypass123')
+        self.faculty.groups.add(Group.objects.create(name='faculty'))
+        self.instructor = User.objects.create_user(username='instructor', password='instructorpass123')
+
+    def test_feed_is_cached(self):
+        """Test a second read of the feed does not hit the database"""
+        Announcement.objects.create(title="Exam week", text="Good luck", posted_by=self.faculty)
+        self.assertEqual(len(get_announcement_feed('all')), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(get_announcement_feed('all')), 1)
+
+    def test_feed_audiences(self):
+        """Test the faculty feed only holds announcements posted by faculty"""
+        Announcement.objects.create(title="From faculty", text="...", posted_by=self.faculty)
+        Announcement.objects.create(title="From instructor", text="...", posted_by=self.instructor)
+        self.assertEqual([a.title for a in get_announcement_feed('faculty')], ["From faculty"])
+        self.assertEqual(len(get_announcement_feed('all')), 2)
+
+    def test_posting_invalidates_feed(self):
+        """Test post_announcement makes the new announcement visible immediately"""
+        self.assertEqual(get_announcement_feed('faculty'), [])
+        self.client.login(username='faculty', password='facultypass123')
+        response = self.client.post(reverse('post_announcement'), {'title': 'Resits', 'text': 'Schedule is out'})
+        self.assertEqual(response.json(), {'status': 'success'})
+        self.assertEqual([a.title for a in get_announcement_feed('faculty')], ['Resits'])
+
+    def test_feed_is_bounded(self):
+        """Test the feed never returns more than the requested number of announcements"""
+        for i in range(4):
+            Announcement.objects.create(title=f"News {i}", text="...")
+        self.assertEqual([a.title for a in get_announcement_feed('all', limit=2)], ["News 3", "News 2"])
+
+    def test_file_cache_backend(self):
+        """Test the feed works with the file-based cache backend"""
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        caches = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}}
+        with override_settings(CACHES=caches):
+            Announcement.objects.create(title="On disk", text="...")
+            self.assertEqual([a.title for a in get_announcement_feed('all')], ["On disk"])
+            Announcement.objects.create(title="Newer", text="...")
+            with self.assertNumQueries(1):
+                self.assertEqual([a.title for a in get_announcement_feed('all')], ["Newer", "On disk"])
@@ -1,7 +1,8 @@
 from django.shortcuts import render
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
-from exams.models import Course
+from exams.catalog import get_catalog
+from .feeds import get_announcement_feed
 from .models import Announcement
 
 @csrf_exempt  # for simplicity; better to use CSRF properly
@@ -25,11 +26,11 @@ def post_announcement(request):
     
     return JsonResponse({"status": "error", "message": "Invalid request method"}, status=405)
 def student_announcements(request):
-    announcements = Announcement.objects.all().order_by('-created_at')
+    announcements = get_announcement_feed('all')
     return render(request, 'student_announcements.html', {"announcements": announcements})
 
 def instructor_home(request):
-    announcements = Announcement.objects.filter(posted_by__groups__name='faculty').order_by('-created_at')
+    announcements = get_announcement_feed('faculty')
     return render(request, 'instructor_home.html', {
         'announcements': announcements
     })
@@ -43,6 +44,6 @@ def facultysecanoun(request):
     return render(request, 'facultysec-anoun.html')
 
 def insresitexam(request):
-    courses = Course.objects.all()
+    courses = get_catalog()
     return render(request, 'insresitexam.html', {'courses': courses})
     
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Cached resit announcements per student.
+
+A student's announcement (their declared courses with schedule and exam
+details) is built with one joined query and cached under the student's user
+id, together with the version tokens it was built from: one per student for
+their resit declarations and one per course for its schedule, details, code
+and name. Changing any of them replaces the token (see declarations/signals.py,
+and the bulk importers which bypass signals), so a cached announcement is
+rebuilt on its next read when anything it shows has changed. Announcements and
+tokens must live in a cache all server processes share (see CACHES in
+settings.py); with a per-process backend, only the process that handled a
+change sees it before TIMEOUT.
+"""
+import uuid
+
+from django.core.cache import cache
+
+from exams.models import Course
+from users.models import StudentProfile
+from se302_project.conf import app_setting
+
+
+def student_version_key(student_id):
+    return f'resits:student:{student_id}:version'
+
+
+def course_version_key(course_id):
+    return f'resits:course:{course_id}:version'
+
+
+def invalidate_student(student_id):
+    cache.set(student_version_key(student_id), uuid.uuid4().hex, timeout=None)
+
+
+def invalidate_courses(course_ids):
+    token = uuid.uuid4().hex
+    cache.set_many({course_version_key(course_id): token for course_id in course_ids}, timeout=None)
+
+
+def _get_versions(keys):
+    versions = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return versions
+
+
+def _build_announcement(student_id):
+    """
+    The declared course ids and {course_id: {'course', 'schedule', 'content'}}
+    for those of them with a schedule or exam details.
+    """
+    courses = list(
+        Course.objects
+        .filter(grade__student_id=student_id, grade__declared_resit=True)
+        .select_related('resitexamschedule', 'resitexamcontent')
+        .order_by('code')
+    )
+    resit_details = {}
+    for course in courses:
+        schedule = getattr(course, 'resitexamschedule', None)
+        content = getattr(course, 'resitexamcontent', None)
+        if schedule is not None or content is not None:
+            resit_details[course.id] = {'course': course, 'schedule': schedule, 'content': content}
+    return [course.id for course in courses], resit_details
+
+
+def get_resit_announcement(user):
+    """
+    Return the student's resit details, or None when the user has no
+    StudentProfile. A cache hit runs no queries.
+    """
+    key = f'resits:announcement:{user.pk}'
+    cached = cache.get(key)
+    if cached is not None and cache.get_many(list(cached['versions'])) == cached['versions']:
+        return cached['resit_details']
+
+    student_id = StudentProfile.objects.filter(user=user).values_list('id', flat=True).first()
+    if student_id is None:
+        return None
+
+    # Read the declaration token before querying: a declaration saved while the
+    # announcement is built replaces it, so the cached copy is rebuilt next time.
+    versions = _get_versions([student_version_key(student_id)])
+    course_ids, resit_details = _build_announcement(student_id)
+    versions.update(_get_versions([course_version_key(course_id) for course_id in course_ids]))
+    cache.set(
+        key,
+        {'versions': versions, 'resit_details': resit_details},
+        timeout=app_setting('RESIT_ANNOUNCEMENTS', 'TIMEOUT'),
+    )
+    return resit_details
@@ -5,7 +5,7 @@ class ExcelUploadForm(forms.Form):
     excel_file = forms.FileField(
         label="Upload Excel File",
         widget=forms.FileInput(attrs={
-            'accept': '.xlsx,.xls',
+            'accept': '.xlsx,.csv',
             'class': 'form-control',
             'aria-label': 'Upload'
         })
@@ -0,0 +1,254 @@
+"""
+Resit schedule and resit details imports, shared by the upload views and the
+background import jobs.
+"""
+import logging
+
+from django.db import transaction
+
+from exams.catalog import get_course, resolve_codes
+from se302_project.logutils import ImportLog
+from .announcements import invalidate_courses
+from se302_project.spreadsheets import InvalidSpreadsheet, iter_numbered_rows, iter_sheets, read_header
+from .models import ResitExamContent, ResitExamSchedule
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_HEADERS = ['course id', 'course name', 'place', 'date']
+DETAILS_HEADERS = ['num_questions', 'exam_type', 'calculator_allowed']
+DETAILS_FIELDS = ['num_questions', 'exam_type', 'calculator_allowed', 'additional_notes']
+COURSE_CODE_HEADERS = ['course code', 'course id', 'code']
+
+
+def import_resit_schedule(uploaded_file, progress=None):
+    """
+    Create or update the resit schedule of every course listed in the sheet.
+    Raises InvalidSpreadsheet when the expected columns are missing; bad rows
+    are skipped and reported in the result's errors.
+    Course codes are resolved from the course catalog and the schedules are
+    written with one bulk upsert, inside one transaction.
+    """
+    headers = read_header(uploaded_file)
+    if not all(header in headers for header in SCHEDULE_HEADERS):
+        raise InvalidSpreadsheet('Excel file must contain columns: Course ID, Course Name, Place, Date.')
+
+    col_indices = {header: headers.index(header) for header in SCHEDULE_HEADERS}
+    errors = []
+    rows = []
+
+    with ImportLog(logger, 'resit schedule') as log:
+        for count, (row_idx, data_row) in enumerate(iter_numbered_rows(uploaded_file), start=1):
+            log.row(row_idx, data_row)
+            if progress:
+                progress(count)
+            try:
+                rows.append((row_idx, *(data_row[col_indices[header]] for header in SCHEDULE_HEADERS)))
+            except IndexError:
+                errors.append(f"Row {row_idx}: Incomplete data in row: {data_row}")
+
+        courses = resolve_codes({str(course_id).strip() for _, course_id, *_ in rows if course_id is not None})
+
+        # One schedule per course; a later row for the same course wins.
+        schedules = {}
+        for row_idx, course_id, course_name, place, date in rows:
+            course = courses.get(str(course_id).strip()) if course_id is not None else None
+            if course is None:
+                errors.append(f"Row {row_idx}: Course with ID {course_id} not found.")
+                continue
+            if course_name and str(course_name).strip().lower() != course.name.lower():
+                errors.append(f"Row {row_idx}: Course name '{course_name}' does not match Course ID {course_id}.")
+                continue
+
+            place = str(place).strip() if place else ''
+            date = str(date).strip() if date else ''
+            if not place or not date:
+                errors.append(f"Row {row_idx}: Place and Date are required.")
+                continue
+
+            if len(place) + len(date) + 2 > 100:
+                errors.append(f"Row {row_idx}: Combined Place and Date exceed 100 characters.")
+                continue
+
+            schedules[course.id] = ResitExamSchedule(course_id=course.id, place=place, date=date)
+
+        if schedules:
+            with transaction.atomic():
+                ResitExamSchedule.objects.bulk_create(
+                    schedules.values(),
+                    update_conflicts=True,
+                    unique_fields=['course'],
+                    update_fields=['place', 'date'],
+                    batch_size=500,
+                )
+            # Bulk upserts send no signals.
+            invalidate_courses(schedules)
+        log.errors = errors
+
+    return {'errors': errors}
+
+
+def parse_resit_details(num_questions, exam_type, calculator_allowed, additional_notes):
+    """ResitExamContent field values of one details row; raises ValueError when a cell is invalid."""
+    try:
+        # Workbook cells are numbers, CSV cells are text.
+        if isinstance(num_questions, bool) or not isinstance(num_questions, (int, float, str)):
+            raise ValueError
+        count = float(num_questions)
+    except ValueError:
+        raise ValueError(f"Invalid 'num_questions' value: {num_questions}")
+    if not count.is_integer() or count < 0:
+        raise ValueError(f"'num_questions' must be a whole number of 0 or more: {num_questions}")
+
+    calc_allowed = str(calculator_allowed).strip().lower()
+    if calc_allowed not in ['yes', 'no']:
+        raise ValueError(f"Invalid 'calculator_allowed' value: {calculator_allowed}")
+
+    return {
+        'num_questions': int(count),
+        'exam_type': str(exam_type or '').strip(),
+        'calculator_allowed': calc_allowed == 'yes',
+        'additional_notes': str(additional_notes or '').strip(),
+    }
+
+
+def import_resit_details(course, uploaded_file, progress=None):
+    """
+    Store the resit exam details (num_questions, exam_type, calculator_allowed,
+    additional_notes) of one course. Every row is validated first and nothing is
+    written if any row is invalid; when the sheet holds several rows the last
+    one is stored.
+    Returns a result dict with the per-row errors.
+    """
+    errors = []
+    details = None
+    with ImportLog(logger, 'resit details', course=course.code) as log:
+        for count, (row_idx, row) in enumerate(iter_numbered_rows(uploaded_file), start=1):
+            log.row(row_idx, row)
+            if progress:
+                progress(count)
+            if len(row) < 4:
+                errors.append(f"Row {row_idx}: Incomplete data in row: {row}")
+                continue
+            try:
+                details = parse_resit_details(*row[:4])
+            except ValueError as e:
+                errors.append(f"Row {row_idx}: {e}")
+
+        log.errors = errors
+        if not errors and details is not None:
+            with transaction.atomic():
+                ResitExamContent.objects.update_or_create(course=course, defaults=details)
+
+    return {'errors': errors}
+
+
+def import_resit_details_bulk(uploaded_file, progress=None):
+    """
+    Store the resit exam details of many courses from one upload. Each sheet
+    (workbook tab) needs the num_questions, exam_type and calculator_allowed
+    columns, plus a Course Code column; a tab without one is read as the details
+    of the course whose code is the tab title.
+    Rows repeating a course with the same details are collapsed; conflicting
+    rows are reported. Nothing is written if any row is invalid, otherwise all
+    courses are saved with one bulk upsert.
+    """
+    errors = []
+    rows = []
+    sheets = []
+    count = 0
+
+    with ImportLog(logger, 'resit details bulk') as log:
+        for title, sheet_rows in iter_sheets(uploaded_file):
+            sheets.append(title)
+            header_row = next(sheet_rows, None)
+            if header_row is None:
+                continue
+            headers = [str(value).strip().lower() if value is not None else '' for value in header_row[1]]
+            if not all(header in headers for header in DETAILS_HEADERS):
+                raise InvalidSpreadsheet(
+                    f"{_sheet_label(title)} must contain columns: num_questions, exam_type, calculator_allowed."
+                )
+            code_col = next((headers.index(header) for header in COURSE_CODE_HEADERS if header in headers), None)
+            if code_col is None and title is None:
+                raise InvalidSpreadsheet("CSV file must contain a Course Code column.")
+            field_cols = [headers.index(field) if field in headers else None for field in DETAILS_FIELDS]
+
+            for row_idx, row in sheet_rows:
+                count += 1
+                log.row(row_idx, row)
+                if progress:
+                    progress(count)
+                values = [row[col] if col is not None and col < len(row) else None for col in field_cols]
+                if code_col is None:
+                    code = title
+                elif code_col < len(row):
+                    code = row[code_col]
+                else:
+                    # The row stops before its Course Code cell.
+                    rows.append((title, row_idx, None, row))
+                    continue
+                rows.append((title, row_idx, str(code).strip() if code is not None else '', values))
+
+        multi_sheet = len(sheets) > 1
+        courses = resolve_codes({code for _, _, code, _ in rows if code})
+
+        # One details record per course; identical repeats are dropped.
+        details = {}
+        first_seen = {}
+        for title, row_idx, code, values in rows:
+            where = _row_label(title, row_idx, multi_sheet)
+            if code is None:
+                errors.append(f"{where}: Incomplete data in row: {values}")
+                continue
+            course = courses.get(code)
+            if course is None:
+                errors.append(f"{where}: Course with code {code or '(blank)'} not found.")
+                continue
+            try:
+                defaults = parse_resit_details(*values)
+            except ValueError as e:
+                errors.append(f"{where}: {e}")
+                continue
+            if course.id in details:
+                if details[course.id] != defaults:
+                    errors.append(
+                        f"{where}: Conflicting details row for {course.code} (first in {first_seen[course.id]})"
+                    )
+                continue
+            details[course.id] = defaults
+            first_seen[course.id] = where
+
+        log.errors = errors
+        if not errors and details:
+            with transaction.atomic():
+                ResitExamContent.objects.bulk_create(
+                    [ResitExamContent(course_id=course_id, **defaults) for course_id, defaults in details.items()],
+                    update_conflicts=True,
+                    unique_fields=['course'],
+                    update_fields=DETAILS_FIELDS,
+                    batch_size=500,
+                )
+            invalidate_courses(details)
+
+    return {'errors': errors, 'courses': 0 if errors else len(details)}
+
+
+def _sheet_label(title):
+    return f"Sheet '{title}'" if title is not None else "Sheet"
+
+
+def _row_label(title, row_idx, multi_sheet):
+    return f"Sheet '{title}' row {row_idx}" if multi_sheet else f"Row {row_idx}"
+
+
+def run_schedule_import_job(uploaded_file, params, progress):
+    return import_resit_schedule(uploaded_file, progress)
+
+
+def run_details_import_job(uploaded_file, params, progress):
+    course = get_course(params['course_id'])
+    return import_resit_details(course, uploaded_file, progress)
+
+
+def run_bulk_details_import_job(uploaded_file, params, progress):
+    return import_resit_details_bulk(uploaded_file, progress)
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from exams.models import Course, Grade
+from .announcements import invalidate_courses, invalidate_student
+from .models import ResitExamContent, ResitExamSchedule
+
+
+@receiver(post_save, sender=Grade)
+def invalidate_student_on_declaration(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and 'declared_resit' not in update_fields:
+        return
+    invalidate_student(instance.student_id)
+
+
+@receiver(post_delete, sender=Grade)
+def invalidate_student_on_delete(sender, instance, **kwargs):
+    invalidate_student(instance.student_id)
+
+
+@receiver(post_save, sender=ResitExamSchedule)
+@receiver(post_delete, sender=ResitExamSchedule)
+@receiver(post_save, sender=ResitExamContent)
+@receiver(post_delete, sender=ResitExamContent)
+def invalidate_course_on_resit_change(sender, instance, **kwargs):
+    invalidate_courses([instance.course_id])
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course_on_change(sender, instance, **kwargs):
+    invalidate_courses([instance.id])
@@ -1,3 +1,286 @@
+from io import BytesIO
+
+import openpyxl
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from django.urls import reverse
+
+from exams.catalog import get_catalog
+from exams.models import Course, Grade
+from users.models import StudentProfile
+from .importers import import_resit_details_bulk, import_resit_schedule
+from .models import ResitExamContent, ResitExamSchedule
+
+
+class ResitDetailsUploadTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(code="TC101", name="Test Course")
+        self.url = reverse('upload_resit_details', args=[self.course.id])
+
+    def upload(self, content):
+        return self.client.post(self.url, {'excel_file': SimpleUploadedFile('details.csv', content, content_type='text/csv')})
+
+    def test_upload_resit_details(self):
+        """Test a valid details sheet is stored for the course"""
+        response = self.upload(b"num_questions,exam_type,calculator_allowed,additional_notes\n20,Written,Yes,Bring ID\n")
+        self.assertJSONEqual(response.content, {'status': 'success'})
+        content = ResitExamContent.objects.get(course=self.course)
+        self.assertEqual((content.num_questions, content.exam_type, content.calculator_allowed), (20, 'Written', True))
+
+    def test_invalid_details_are_all_reported_and_nothing_saved(self):
+        """Test every invalid row is reported at once and no details are written"""
+        response = self.upload(
+            b"num_questions,exam_type,calculator_allowed,additional_notes\n"
+            b"many,Written,Yes,\n"
+            b"10,Oral,Maybe,\n"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], [
+            "Row 2: Invalid 'num_questions' value: many",
+            "Row 3: Invalid 'calculator_allowed' value: Maybe",
+        ])
+        self.assertFalse(ResitExamContent.objects.exists())
+
+    def test_last_details_row_is_stored(self):
+        """Test a sheet with several valid rows stores the last one"""
+        response = self.upload(
+            b"num_questions,exam_type,calculator_allowed,additional_notes\n"
+            b"20,Written,Yes,\n"
+            b"10,Oral,No,\n"
+        )
+        self.assertJSONEqual(response.content, {'status': 'success'})
+        content = ResitExamContent.objects.get(course=self.course)
+        self.assertEqual((content.num_questions, content.exam_type, content.calculator_allowed), (10, 'Oral', False))
+
+
+class ResitDetailsBulkImportTests(TestCase):
+    HEADER = "Course Code,num_questions,exam_type,calculator_allowed,additional_notes\n"
+
+    def setUp(self):
+        self.courses = [Course.objects.create(code=f"TC10{i}", name=f"Course {i}") for i in range(5)]
+
+    def csv(self, body):
+        return SimpleUploadedFile('details.csv', (self.HEADER + body).encode(), content_type='text/csv')
+
+    def test_details_of_many_courses_are_upserted(self):
+        """Test one sheet keyed by course code stores every course and collapses identical repeats"""
+        ResitExamContent.objects.create(course=self.courses[0], num_questions=5, exam_type='Oral', calculator_allowed=False)
+        result = import_resit_details_bulk(self.csv(
+            "TC100,20,Written,Yes,Bring ID\n"
+            "TC101,10,Oral,No,\n"
+            "TC101,10,Oral,No,\n"
+        ))
+        self.assertEqual(result, {'errors': [], 'courses': 2})
+        details = dict(ResitExamContent.objects.values_list('course__code', 'num_questions'))
+        self.assertEqual(details, {'TC100': 20, 'TC101': 10})
+        self.assertEqual(ResitExamContent.objects.get(course=self.courses[0]).additional_notes, 'Bring ID')
+
+    def test_conflicts_and_unknown_courses_are_reported_and_nothing_saved(self):
+        """Test conflicting repeats and unknown codes are all reported and no details are written"""
+        result = import_resit_details_bulk(self.csv(
+            "TC100,20,Written,Yes,\n"
+            "TC100,25,Written,Yes,\n"
+            "XX999,10,Oral,No,\n"
+            "TC102,10,Oral,Maybe,\n"
+        ))
+        self.assertEqual(result['errors'], [
+            "Row 3: Conflicting details row for TC100 (first in Row 2)",
+            "Row 4: Course with code XX999 not found.",
+            "Row 5: Invalid 'calculator_allowed' value: Maybe",
+        ])
+        self.assertFalse(ResitExamContent.objects.exists())
+
+    def test_row_missing_its_code_cell_is_incomplete(self):
+        """Test a row shorter than the Course Code column is reported as incomplete, not as an unknown course"""
+        upload = SimpleUploadedFile(
+            'details.csv',
+            b"num_questions,exam_type,calculator_allowed,Course Code\n10,Oral,No,TC100\n10,Oral,No\n",
+            content_type='text/csv',
+        )
+        result = import_resit_details_bulk(upload)
+        self.assertEqual(result['errors'], ["Row 3: Incomplete data in row: ('10', 'Oral', 'No')"])
+
+    def test_conflicting_rows_keep_the_sheet_title_as_written(self):
+        """Test duplicate-row messages name the first sheet without changing its case"""
+        workbook = openpyxl.Workbook()
+        workbook.active.title = 'Term A'
+        workbook.create_sheet('Term B')
+        for sheet, num_questions in [(workbook['Term A'], 20), (workbook['Term B'], 25)]:
+            sheet.append(['Course Code', 'num_questions', 'exam_type', 'calculator_allowed'])
+            sheet.append(['TC100', num_questions, 'Written', 'No'])
+        content = BytesIO()
+        workbook.save(content)
+        result = import_resit_details_bulk(SimpleUploadedFile('details.xlsx', content.getvalue()))
+        self.assertEqual(result['errors'], [
+            "Sheet 'Term B' row 2: Conflicting details row for TC100 (first in Sheet 'Term A' row 2)",
+        ])
+
+    def test_csv_number_cells_are_parsed_where_read(self):
+        """Test CSV text cells are parsed as counts and nan/inf are rejected"""
+        result = import_resit_details_bulk(self.csv(
+            "TC100,Infinity,Written,Yes,\n"
+            "TC101,nan,Written,Yes,\n"
+            "TC102,1e1,Written,Yes,\n"
+        ))
+        self.assertEqual(result['errors'], [
+            "Row 2: 'num_questions' must be a whole number of 0 or more: Infinity",
+            "Row 3: 'num_questions' must be a whole number of 0 or more: nan",
+        ])
+        Course.objects.create(code="0123", name="Leading Zero")
+        result = import_resit_details_bulk(self.csv("0123,12,Written,Yes,\n"))
+        self.assertEqual(result, {'errors': [], 'courses': 1})
+        self.assertEqual(ResitExamContent.objects.get(course__code="0123").num_questions, 12)
+
+    def test_one_tab_per_course(self):
+        """Test a workbook with one tab per course uses the tab title as the course code"""
+        workbook = openpyxl.Workbook()
+        workbook.remove(workbook.active)
+        for code, num_questions in [('TC100', 20), ('TC103', 15)]:
+            sheet = workbook.create_sheet(code)
+            sheet.append(['num_questions', 'exam_type', 'calculator_allowed', 'place_and_time', 'additional_notes'])
+            sheet.append([num_questions, 'Written', 'No', 'Hall A', ''])
+        workbook.create_sheet('XX999').append(['num_questions', 'exam_type', 'calculator_allowed'])
+        workbook['XX999'].append([10, 'Oral', 'Yes'])
+        content = BytesIO()
+        workbook.save(content)
+
+        result = import_resit_details_bulk(SimpleUploadedFile('details.xlsx', content.getvalue()))
+
+        self.assertEqual(result['errors'], ["Sheet 'XX999' row 2: Course with code XX999 not found."])
+        workbook.remove(workbook['XX999'])
+        content = BytesIO()
+        workbook.save(content)
+        result = import_resit_details_bulk(SimpleUploadedFile('details.xlsx', content.getvalue()))
+        self.assertEqual(result, {'errors': [], 'courses': 2})
+        details = dict(ResitExamContent.objects.values_list('course__code', 'num_questions'))
+        self.assertEqual(details, {'TC100': 20, 'TC103': 15})
+
+    def test_bulk_import_query_count_is_constant(self):
+        """Test courses are resolved from the catalog and details written without per-row queries"""
+        sheet = self.csv("".join(f"{course.code},10,Written,No,\n" for course in self.courses))
+        get_catalog()
+        # savepoint, upsert, release
+        with self.assertNumQueries(3):
+            result = import_resit_details_bulk(sheet)
+        self.assertEqual(result, {'errors': [], 'courses': 5})
+
+    def test_upload_view_requires_faculty(self):
+        """Test the bulk upload view stores the details for a faculty user only"""
+        url = reverse('upload_resit_details_bulk')
+        faculty = User.objects.create_user(username='faculty', password='facultypass123')
+        faculty.groups.add(Group.objects.create(name='faculty'))
+        User.objects.create_user(username='student', password='studentpass123')
+
+        self.client.login(username='student', password='studentpass123')
+        response = self.client.post(url, {'excel_file': self.csv("TC100,20,Written,Yes,\n")})
+        self.assertNotEqual(response.status_code, 200)
+
+        self.client.login(username='faculty', password='facultypass123')
+        response = self.client.post(url, {'excel_file': self.csv("TC100,20,Written,Yes,\n")})
+        self.assertJSONEqual(response.content, {'status': 'success', 'courses': 1})
+        self.assertTrue(ResitExamContent.objects.filter(course=self.courses[0]).exists())
+
+
+class ResitScheduleImportTests(TestCase):
+    def setUp(self):
+        self.courses = [Course.objects.create(code=f"TC10{i}", name=f"Course {i}") for i in range(5)]
+
+    def test_schedule_rows_are_upserted(self):
+        """Test valid rows are stored, a later row for a course wins and bad rows are reported"""
+        ResitExamSchedule.objects.create(course=self.courses[0], place='Old Hall', date='2025-06-01')
+        sheet = SimpleUploadedFile('schedule.csv', (
+            "Course ID,Course Name,Place,Date\n"
+            "TC100,Course 0,Hall A,2025-07-01\n"
+            "TC101,Course 1,Hall B,2025-07-02\n"
+            "TC101,Course 1,Hall C,2025-07-03\n"
+            "XX999,Nope,Hall D,2025-07-04\n"
+            "TC102,Wrong Name,Hall E,2025-07-05\n"
+            "TC103,,,\n"
+        ).encode(), content_type='text/csv')
+
+        errors = import_resit_schedule(sheet)['errors']
+
+        self.assertEqual(errors, [
+            "Row 5: Course with ID XX999 not found.",
+            "Row 6: Course name 'Wrong Name' does not match Course ID TC102.",
+            "Row 7: Place and Date are required.",
+        ])
+        schedules = dict(ResitExamSchedule.objects.values_list('course__code', 'place'))
+        self.assertEqual(schedules, {'TC100': 'Hall A', 'TC101': 'Hall C'})
+
+    def test_schedule_import_query_count_is_constant(self):
+        """Test courses are resolved from the catalog and schedules written without per-row queries"""
+        sheet = SimpleUploadedFile('schedule.csv', (
+            "Course ID,Course Name,Place,Date\n"
+            + "".join(f"{course.code},{course.name},Hall,2025-07-01\n" for course in self.courses)
+        ).encode(), content_type='text/csv')
+        get_catalog()
+        # savepoint, upsert, release
+        with self.assertNumQueries(3):
+            errors = import_resit_schedule(sheet)['errors']
+        self.assertEqual(errors, [])
+        self.assertEqual(ResitExamSchedule.objects.count(), 5)
+
+
+class ResitAnnouncementTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.courses = [Course.objects.create(code=f"TC10{i}", name=f"Course {i}") for i in range(3)]
+        user = User.objects.create_user(username='student', password='studentpass123')
+        user.groups.add(Group.objects.create(name='student'))
+        self.student = StudentProfile.objects.create(user=user, program='CS')
+        self.grades = [Grade.objects.create(student=self.student, course=course, declared_resit=True) for course in self.courses[:2]]
+        Grade.objects.create(student=self.student, course=self.courses[2])
+        ResitExamSchedule.objects.create(course=self.courses[0], place='Hall A', date='2025-07-01')
+        ResitExamContent.objects.create(course=self.courses[1], num_questions=10, exam_type='Oral')
+        ResitExamSchedule.objects.create(course=self.courses[2], place='Hall C', date='2025-07-03')
+        self.client.login(username='student', password='studentpass123')
+        self.url = reverse('resitannouncement')
+
+    def announced(self):
+        response = self.client.get(self.url)
+        return {detail['course'].code: detail for detail in response.context['resit_details'].values()}
+
+    def test_declared_courses_are_listed_and_cached(self):
+        """Test only declared courses are shown and a repeat view runs no announcement queries"""
+        announced = self.announced()
+        self.assertEqual(sorted(announced), ['TC100', 'TC101'])
+        self.assertEqual(announced['TC100']['schedule'].place, 'Hall A')
+        self.assertIsNone(announced['TC100']['content'])
+        self.assertEqual(announced['TC101']['content'].num_questions, 10)
+
+        self.client.get(self.url)  # warm the session and role caches
+        # session, user
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+    def test_changes_invalidate_the_cached_announcement(self):
+        """Test declarations, schedule and details changes are visible on the next view"""
+        self.announced()
+
+        Grade.objects.filter(pk=self.grades[1].pk).update(declared_resit=False)  # no signal: still cached
+        self.assertIn('TC101', self.announced())
+        grade = Grade.objects.get(pk=self.grades[1].pk)
+        grade.save(update_fields=['declared_resit'])
+        self.assertNotIn('TC101', self.announced())
+
+        ResitExamSchedule.objects.filter(course=self.courses[0]).update(place='Hall Z')
+        sheet = SimpleUploadedFile('schedule.csv', b"Course ID,Course Name,Place,Date\nTC100,Course 0,Hall B,2025-07-02\n")
+        self.assertEqual(import_resit_schedule(sheet)['errors'], [])
+        self.assertEqual(self.announced()['TC100']['schedule'].place, 'Hall B')
+
+        sheet = SimpleUploadedFile('details.csv', (
+            "Course Code,num_questions,exam_type,calculator_allowed,additional_notes\n"
+            "TC100,20,Written,Yes,\n"
+        ).encode())
+        self.assertEqual(import_resit_details_bulk(sheet)['errors'], [])
+        self.assertEqual(self.announced()['TC100']['content'].num_questions, 20)
 
-# Create your tests here.
+    def test_other_students_are_unaffected(self):
+        """Test a declaration by another student does not change this student's announcement"""
+        self.announced()
+        other = StudentProfile.objects.create(user=User.objects.create_user(username='other'), program='CS')
+        Grade.objects.create(student=other, course=self.courses[2], declared_resit=True)
+        self.assertEqual(sorted(self.announced()), ['TC100', 'TC101'])
@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path('resitannouncement/', views.resitannouncement, name='resitannouncement'),
     path('upload_resit_details/<int:course_id>/', views.upload_resit_details, name='upload_resit_details'),
+    path('upload_resit_details/', views.upload_resit_details_bulk, name='upload_resit_details_bulk'),
     
     path('facultysecexam/', views.facultysecexam, name='facultysecexam'),
     path('upload_resit_schedule/', views.upload_resit_schedule, name='upload_resit_schedule'),
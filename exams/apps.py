@@ -1,6 +1,9 @@
 from django.apps import AppConfig
 
 
-class CoursesConfig(AppConfig):
+class ExamsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'courses'
+    name = 'exams'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,482 @@
+"""
+Synthetic data and benchmarks for the grade, resit and upload hot paths, and
+the render time of each page.
+
+Used by the benchmark_grade_page, run_benchmarks and generate_synthetic_data
+management commands.
+"""
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+
+import openpyxl
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, connections
+from django.db.models import Count
+from django.template import engines
+from django.template.base import Template
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_databases, teardown_databases
+from django.urls import reverse
+from django.utils import timezone
+
+from declarations.models import ResitExamContent, ResitExamSchedule
+from se302_project.conf import app_setting
+from users.models import StudentProfile
+
+from .catalog import invalidate_catalog
+from .models import Course, Grade
+from .utils import compute_grades, refresh_grade_summaries
+
+BENCHMARK_PASSWORD = 'benchmark-pass'
+
+
+@contextmanager
+def isolated_database(verbosity=0):
+    """Run the benchmark against a throwaway copy of the configured database.
+
+    SQLite test databases default to in-memory, which would hide the journal mode
+    and locking behaviour being measured, so they are pointed at a temporary file.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        original_name = test_settings.get('NAME')
+        if connection.vendor == 'sqlite':
+            test_settings['NAME'] = str(Path(tmpdir) / 'benchmark.sqlite3')
+        old_config = setup_databases(verbosity, interactive=False, aliases={'default'})
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                yield
+        finally:
+            teardown_databases(old_config, verbosity)
+            test_settings['NAME'] = original_name
+
+
+def create_synthetic_data(courses=10, students=200, grades_per_student=6, resit_ratio=0.2, seed=0):
+    """Create courses with resit schedules, student accounts, graded enrollments
+    and resit declarations in bulk.
+
+    Every account shares BENCHMARK_PASSWORD; it is hashed once. Returns the
+    created StudentProfile ids.
+    """
+    rng = random.Random(seed)
+    password = make_password(BENCHMARK_PASSWORD)
+    group, _ = Group.objects.get_or_create(name='student')
+
+    course_objs = Course.objects.bulk_create([
+        Course(code=f'BN{i:03d}', name=f'Benchmark Course {i}') for i in range(courses)
+    ])
+    course_objs = list(Course.objects.filter(code__in=[c.code for c in course_objs]))
+    invalidate_catalog()
+    ResitExamSchedule.objects.bulk_create([
+        ResitExamSchedule(course=course, place=f'Hall {i % 5 + 1}', date=f'2025-07-{i % 28 + 1:02d}')
+        for i, course in enumerate(course_objs)
+    ])
+    ResitExamContent.objects.bulk_create([
+        ResitExamContent(course=course, exam_type='Written', num_questions=10, calculator_allowed=i % 2 == 0)
+        for i, course in enumerate(course_objs)
+    ])
+
+    users = User.objects.bulk_create([
+        User(username=f'bench{i}@example.com', email=f'bench{i}@example.com',
+             first_name='Bench', last_name=str(i), password=password)
+        for i in range(students)
+    ])
+    users = list(User.objects.filter(username__in=[u.username for u in users]).order_by('id'))
+    User.groups.through.objects.bulk_create([
+        User.groups.through(user_id=user.id, group_id=group.id) for user in users
+    ])
+    profiles = StudentProfile.objects.bulk_create([
+        StudentProfile(user=user, program='SE', generated_password=BENCHMARK_PASSWORD) for user in users
+    ])
+    profiles = list(StudentProfile.objects.filter(user__in=users).order_by('id'))
+
+    grades = []
+    for profile in profiles:
+        for course in rng.sample(course_objs, min(grades_per_student, len(course_objs))):
+            grades.append(Grade(
+                student=profile,
+                course=course,
+                midterm_grade=rng.randint(0, 100),
+                final_exam_grade=rng.randint(0, 100),
+                absences=rng.randint(0, 4),
+            ))
+    computed = compute_grades(
+        [g.midterm_grade for g in grades],
+        [g.final_exam_grade for g in grades],
+        [g.absences for g in grades],
+    )
+    for i, grade in enumerate(grades):
+        grade.final_grade = computed['final_grade'][i]
+        grade.letter_grade = computed['letter_grade'][i]
+        grade.eligibility = computed['eligibility'][i]
+        grade.declared_resit = grade.eligibility == 'Eligible' and rng.random() < resit_ratio
+    Grade.objects.bulk_create(grades, batch_size=1000)
+    refresh_grade_summaries([profile.id for profile in profiles])
+    return [profile.id for profile in profiles]
+
+
+def create_staff_account(role='instructor'):
+    """Create (or reuse) a benchmark account in the given role group."""
+    user, created = User.objects.get_or_create(
+        username=f'bench-{role}@example.com',
+        defaults={'email': f'bench-{role}@example.com', 'password': make_password(BENCHMARK_PASSWORD)},
+    )
+    if created:
+        user.groups.add(Group.objects.get_or_create(name=role)[0])
+    return user
+
+
+def summarize_timings(timings, elapsed):
+    """Turn a list of per-request durations (seconds) into throughput and percentiles."""
+    timings = sorted(timings)
+    if len(timings) > 1:
+        cuts = statistics.quantiles(timings, n=100, method='inclusive')
+        p50, p95 = cuts[49], cuts[94]
+    else:
+        p50 = p95 = timings[0] if timings else 0.0
+    return {
+        'requests': len(timings),
+        'elapsed_seconds': round(elapsed, 4),
+        'requests_per_second': round(len(timings) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(p50 * 1000, 2),
+        'p95_ms': round(p95 * 1000, 2),
+    }
+
+
+def grade_page_throughput(profile_ids, threads=4, requests_per_thread=50, writers=0):
+    """Hit the student grade page from concurrent clients and report throughput.
+
+    Each reader thread logs in as a different student. Optional writer threads
+    keep toggling declared_resit on random grades while the readers run, which
+    is where the SQLite journal mode and busy timeout make a difference.
+    """
+    url = reverse('studentgrade')
+    user_ids = dict(StudentProfile.objects.filter(id__in=profile_ids).values_list('id', 'user_id'))
+    grade_ids = list(Grade.objects.values_list('id', flat=True)[:1000])
+    barrier = threading.Barrier(threads + writers)
+    stop = threading.Event()
+    lock = threading.Lock()
+    timings = []
+    failures = []
+    writes = []
+
+    def reader(index):
+        client = Client()
+        client.force_login(User.objects.get(id=user_ids[profile_ids[index % len(profile_ids)]]))
+        local = []
+        barrier.wait()
+        try:
+            for _ in range(requests_per_thread):
+                start = time.perf_counter()
+                response = client.get(url)
+                local.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    with lock:
+                        failures.append(response.status_code)
+        finally:
+            with lock:
+                timings.extend(local)
+            connections.close_all()
+
+    def writer(index):
+        rng = random.Random(index)
+        count = 0
+        barrier.wait()
+        try:
+            while not stop.is_set() and grade_ids:
+                try:
+                    Grade.objects.filter(id=rng.choice(grade_ids)).update(declared_resit=rng.random() < 0.5)
+                    count += 1
+                except Exception as exc:
+                    with lock:
+                        failures.append(str(exc))
+        finally:
+            with lock:
+                writes.append(count)
+            connections.close_all()
+
+    reader_threads = [threading.Thread(target=reader, args=(i,)) for i in range(threads)]
+    writer_threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    started = time.perf_counter()
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in reader_threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in writer_threads:
+        thread.join()
+
+    result = summarize_timings(timings, elapsed)
+    result.update({
+        'threads': threads,
+        'writers': writers,
+        'writes': sum(writes),
+        'failures': len(failures),
+    })
+    return result
+
+
+def describe_database():
+    """Short description of the active database configuration for benchmark output."""
+    options = connection.settings_dict.get('OPTIONS', {})
+    description = {
+        'vendor': connection.vendor,
+        'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+        'pool': bool(options.get('pool')),
+    }
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            description['journal_mode'] = cursor.fetchone()[0]
+        description['timeout'] = options.get('timeout')
+    return description
+
+
+def describe_rendering():
+    """The template rendering profile (loader caching, fragment caching) for benchmark output."""
+    loaders = engines['django'].engine.loaders
+    return {
+        'debug': settings.DEBUG,
+        'cached_loader': any(
+            (loader[0] if isinstance(loader, (list, tuple)) else loader) == 'django.template.loaders.cached.Loader'
+            for loader in loaders
+        ),
+        'fragment_cache_timeout': app_setting('FRAGMENT_CACHE', 'TIMEOUT'),
+    }
+
+
+@contextmanager
+def template_render_timer():
+    """Collect the duration of every top-level template render (includes excluded) into a list."""
+    durations = []
+    original = Template.render
+
+    def timed_render(self, context):
+        if context.template is not None:
+            return original(self, context)
+        start = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            durations.append(time.perf_counter() - start)
+
+    Template.render = timed_render
+    try:
+        yield durations
+    finally:
+        Template.render = original
+
+
+def _spreadsheet(header, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    content = BytesIO()
+    workbook.save(content)
+    return content.getvalue()
+
+
+def _consume(response):
+    """Read a (possibly streaming) response body so the timing covers the whole download."""
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+        response.close()
+    return response
+
+
+def _logged_in_client(user):
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def _student_with_declarations():
+    grade = Grade.objects.filter(declared_resit=True).select_related('student__user').order_by('id').first()
+    if grade is None:
+        grade = Grade.objects.select_related('student__user').order_by('id').first()
+    return grade.student.user
+
+
+def _busiest_course():
+    return Course.objects.annotate(rows=Count('grade')).order_by('-rows', 'id').first()
+
+
+def bench_studentgrade(runs, upload_rows):
+    client = _logged_in_client(_student_with_declarations())
+    url = reverse('studentgrade')
+    return lambda: client.get(url)
+
+
+def bench_insexam(runs, upload_rows):
+    client = _logged_in_client(create_staff_account('instructor'))
+    url = reverse('insexam')
+    return lambda: client.get(url)
+
+
+def bench_resitannouncement(runs, upload_rows):
+    client = _logged_in_client(_student_with_declarations())
+    url = reverse('resitannouncement')
+    return lambda: client.get(url)
+
+
+def bench_download_resit_excel(runs, upload_rows):
+    client = _logged_in_client(create_staff_account('instructor'))
+    url = reverse('download_resit_excel')
+    course_code = _busiest_course().code
+    return lambda: _consume(client.get(url, {'course_code': course_code}))
+
+
+def bench_upload_grades(runs, upload_rows):
+    """Re-upload the busiest course's sheet with shifted grades so every run writes."""
+    client = _logged_in_client(create_staff_account('instructor'))
+    course = _busiest_course()
+    url = reverse('upload_grades', args=[course.id])
+    emails = list(
+        Grade.objects.filter(course=course).order_by('id').values_list('student__user__email', flat=True)[:upload_rows]
+    )
+    payloads = iter([
+        _spreadsheet(
+            ['email', 'midterm', 'final_exam', 'absences'],
+            [(email, (i * 7 + run) % 101, (i * 13 + run) % 101, i % 4) for i, email in enumerate(emails)],
+        )
+        for run in range(runs)
+    ])
+
+    def request():
+        upload = SimpleUploadedFile('grades.xlsx', next(payloads))
+        return client.post(url, {'grade_file': upload, 'upload_type': 'regular'})
+    return request
+
+
+def bench_upload_excel_students(runs, upload_rows):
+    """Upload fresh students every run; includes password hashing with the configured hashers."""
+    client = _logged_in_client(create_staff_account('faculty'))
+    url = reverse('upload_excel_students')
+    payloads = iter([
+        _spreadsheet(
+            ['email', 'name', 'program'],
+            [(f'upload{run}-{i}@example.com', f'Upload Student {i}', 'SE') for i in range(upload_rows)],
+        )
+        for run in range(runs)
+    ])
+
+    def request():
+        return client.post(url, {'file': SimpleUploadedFile('students.xlsx', next(payloads))})
+    return request
+
+
+def bench_page(url_name, role):
+    """Scenario factory for a plain GET of a page by a staff account in the role."""
+    def factory(runs, upload_rows):
+        client = _logged_in_client(create_staff_account(role))
+        url = reverse(url_name)
+        return lambda: client.get(url)
+    return factory
+
+
+# Scenario name -> factory(runs, upload_rows) returning a zero-argument callable that
+# performs one request against the benchmark data.
+SCENARIOS = {
+    'upload_grades': bench_upload_grades,
+    'studentgrade': bench_studentgrade,
+    'insexam': bench_insexam,
+    'download_resit_excel': bench_download_resit_excel,
+    'upload_excel_students': bench_upload_excel_students,
+    'resitannouncement': bench_resitannouncement,
+    'insresitexam': bench_page('insresitexam', 'instructor'),
+    'facultysecexam': bench_page('facultysecexam', 'faculty'),
+    'facultysecanoun': bench_page('facultysecanoun', 'faculty'),
+    'faculty_payment': bench_page('faculty_payment', 'faculty'),
+}
+
+
+def run_scenario(name, iterations=20, warmup=2, upload_rows=50):
+    """Time one scenario and count the queries of a single request.
+
+    The query count comes from a separate captured request so that capturing
+    does not inflate the timed runs. Scenarios that render a page also report
+    the template render time (render_p50_ms, render_p95_ms).
+    """
+    request = SCENARIOS[name](iterations + warmup + 1, upload_rows)
+    statuses = set()
+    for _ in range(warmup):
+        statuses.add(_consume(request()).status_code)
+
+    with CaptureQueriesContext(connection) as queries:
+        statuses.add(_consume(request()).status_code)
+    query_count = len(queries.captured_queries)
+
+    timings = []
+    with template_render_timer() as render_timings:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            start = time.perf_counter()
+            statuses.add(_consume(request()).status_code)
+            timings.append(time.perf_counter() - start)
+        elapsed = time.perf_counter() - started
+
+    result = summarize_timings(timings, elapsed)
+    result.update({
+        'mean_ms': round(statistics.fmean(timings) * 1000, 2) if timings else 0.0,
+        'queries': query_count,
+        'status_codes': sorted(statuses),
+    })
+    if render_timings:
+        render = summarize_timings(render_timings, elapsed)
+        result.update({'render_p50_ms': render['p50_ms'], 'render_p95_ms': render['p95_ms']})
+    return result
+
+
+def current_revision():
+    """The git commit the benchmark ran against, when available."""
+    try:
+        completed = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def run_suite(scenarios=None, courses=20, students=500, grades_per_student=6, resit_ratio=0.2,
+              iterations=20, warmup=2, upload_rows=50, seed=0):
+    """Build synthetic data and run the selected scenarios. Returns a JSON-ready report.
+
+    Must run inside isolated_database() (or against a database you are happy to fill).
+    """
+    create_synthetic_data(courses, students, grades_per_student, resit_ratio, seed)
+    results = {}
+    for name in scenarios or SCENARIOS:
+        results[name] = run_scenario(name, iterations, warmup, upload_rows)
+    return {
+        'revision': current_revision(),
+        'timestamp': timezone.now().isoformat(),
+        'database': describe_database(),
+        'rendering': describe_rendering(),
+        'dataset': {
+            'courses': courses,
+            'students': students,
+            'grades_per_student': grades_per_student,
+            'resit_ratio': resit_ratio,
+            'seed': seed,
+        },
+        'iterations': iterations,
+        'upload_rows': upload_rows,
+        'results': results,
+    }
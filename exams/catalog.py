@@ -0,0 +1,128 @@
+"""
+Process-local course catalog.
+
+Courses change a few times per term but are read on every dropdown render and
+every import, so each process keeps the (id, code, name) of all courses in
+memory. The snapshot is tagged with a version token kept in the configured
+cache; saving or deleting a course replaces the token (see exams/signals.py),
+and each process reloads its snapshot on the next read. Bulk writes bypass the
+signals, so they call invalidate_catalog() directly.
+
+The token is how processes learn about each other's changes, so the cache
+backend must be shared between them (see CACHES in settings.py). With a
+per-process backend, each snapshot only notices another process's change when
+COURSE_CATALOG['TIMEOUT'] expires.
+"""
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.http import Http404
+
+from se302_project.conf import app_setting
+from .models import Course
+
+VERSION_KEY = 'courses:catalog:version'
+
+CourseEntry = namedtuple('CourseEntry', ['id', 'code', 'name'])
+
+_lock = threading.Lock()
+_snapshot = {'version': None, 'loaded_at': 0.0, 'catalog': None}
+
+
+class CourseCatalog:
+    """Immutable snapshot of all courses, ordered by code, with lookups by code and id.
+
+    `version` identifies the snapshot's data, e.g. to key cached template fragments.
+    """
+
+    def __init__(self, rows, version=None):
+        self.version = version
+        self.courses = tuple(CourseEntry(*row) for row in rows)
+        self.by_code = {course.code: course for course in self.courses}
+        self.by_id = {course.id: course for course in self.courses}
+
+    def __iter__(self):
+        return iter(self.courses)
+
+    def __len__(self):
+        return len(self.courses)
+
+    def get_course(self, course_id):
+        """A Course instance for the id, built without a query; raises Course.DoesNotExist."""
+        entry = self.by_id.get(course_id)
+        if entry is None:
+            raise Course.DoesNotExist(f"Course with id {course_id} does not exist.")
+        return Course.from_db('default', ['id', 'code', 'name'], entry)
+
+
+def _current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_catalog():
+    """The course catalog of this process, reloaded with one query when it is stale."""
+    version = _current_version()
+    with _lock:
+        if (
+            _snapshot['catalog'] is not None
+            and _snapshot['version'] == version
+            and time.monotonic() - _snapshot['loaded_at'] < app_setting('COURSE_CATALOG', 'TIMEOUT')
+        ):
+            return _snapshot['catalog']
+
+    # Loaded after reading the version, so a change made meanwhile is picked up next time.
+    catalog = CourseCatalog(Course.objects.order_by('code').values_list('id', 'code', 'name'), version)
+    with _lock:
+        _snapshot.update(version=version, loaded_at=time.monotonic(), catalog=catalog)
+    return catalog
+
+
+def invalidate_catalog():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    with _lock:
+        _snapshot['catalog'] = None
+
+
+def get_course(course_id):
+    """
+    The course with the id, from the catalog. A course missing from this
+    process's snapshot (e.g. just created in another process) is read from the
+    database, and the catalog is reloaded on its next read; Course.DoesNotExist
+    is raised only when the database has no such course either.
+    """
+    try:
+        return get_catalog().get_course(course_id)
+    except Course.DoesNotExist:
+        course = Course.objects.get(id=course_id)
+        invalidate_catalog()
+        return course
+
+
+def resolve_codes(codes):
+    """
+    {code: CourseEntry} for those of the codes that exist. Codes missing from
+    the snapshot are looked up in the database with one query, as in get_course.
+    """
+    by_code = get_catalog().by_code
+    found = {code: by_code[code] for code in codes if code in by_code}
+    missing = set(codes) - set(found)
+    if missing:
+        rows = list(Course.objects.filter(code__in=missing).values_list('id', 'code', 'name'))
+        if rows:
+            found.update((row[1], CourseEntry(*row)) for row in rows)
+            invalidate_catalog()
+    return found
+
+
+def get_course_or_404(course_id):
+    try:
+        return get_course(course_id)
+    except Course.DoesNotExist:
+        raise Http404("No Course matches the given query.")
@@ -0,0 +1,59 @@
+"""
+Streaming resit roster exports.
+
+Rows come from a values_list projection read with .iterator(), so no model
+instances are built and memory does not depend on the roster size. CSV is
+streamed to the client as it is produced; .xlsx is written with openpyxl's
+write-only mode into a temporary file that is then streamed back.
+"""
+import csv
+import tempfile
+
+import openpyxl
+
+from .models import Grade
+
+CHUNK_SIZE = 2000
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def resit_roster_header(course_codes):
+    return ['Student Email'] if len(course_codes) == 1 else ['Student Email', 'Course Code']
+
+
+def iter_resit_roster(course_codes, chunk_size=CHUNK_SIZE):
+    """Yield one row per student who declared a resit in any of the given courses."""
+    grades = Grade.objects.filter(course__code__in=course_codes, declared_resit=True)
+    if len(course_codes) == 1:
+        rows = grades.order_by('id').values_list('student__user__email')
+    else:
+        rows = grades.order_by('course__code', 'id').values_list('student__user__email', 'course__code')
+    return rows.iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """File-like object whose write() hands the line back instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_xlsx(header, rows, title):
+    """Write the rows to a temporary .xlsx file and return it rewound."""
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title[:31])
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
@@ -0,0 +1,67 @@
+"""
+Grade sheet imports, shared by the upload view and the background import jobs.
+"""
+import logging
+
+from se302_project.logutils import ImportLog
+from se302_project.spreadsheets import iter_numbered_rows
+from .catalog import get_course
+from .utils import bulk_save_grades, bulk_save_resit_grades, validate_resit_rows
+
+logger = logging.getLogger(__name__)
+
+
+def import_grades(course, uploaded_file, upload_type='regular', progress=None):
+    """
+    Import a regular (email, midterm, final, [absences]) or resit (email, resit_grade)
+    grade sheet for one course, all or nothing: the whole sheet is validated first
+    and nothing is written if any row is invalid. Rows matching the stored values
+    are not rewritten. Returns {'errors', 'inserted', 'updated', 'unchanged'}.
+    """
+    if upload_type == "resit":
+        return _import_resit_grades(course, uploaded_file, progress)
+    return _import_regular_grades(course, uploaded_file, progress)
+
+
+def run_import_job(uploaded_file, params, progress):
+    course = get_course(params['course_id'])
+    return import_grades(course, uploaded_file, params.get('upload_type', 'regular'), progress)
+
+
+def _import_regular_grades(course, uploaded_file, progress):
+    rows = []
+    with ImportLog(logger, 'grades', course=course.code) as log:
+        for count, (row_idx, row) in enumerate(iter_numbered_rows(uploaded_file), start=1):
+            log.row(row_idx, row)
+            if progress:
+                progress(count)
+            # Short rows are padded so validation reports them as incomplete.
+            email, midterm, final_exam, absences = (tuple(row) + (None,) * 4)[:4]
+            rows.append((row_idx, email, midterm, final_exam, absences))
+
+        result = bulk_save_grades(course, rows)
+        log.errors = result['errors']
+    return result
+
+
+def _import_resit_grades(course, uploaded_file, progress):
+    rows = []
+    errors = []
+    with ImportLog(logger, 'resit grades', course=course.code) as log:
+        for count, (row_idx, row) in enumerate(iter_numbered_rows(uploaded_file), start=1):
+            log.row(row_idx, row)
+            if progress:
+                progress(count)
+            if len(row) != 2:
+                errors.append(f"Row {row_idx}: Invalid row format: {row}")
+                continue
+            rows.append((row_idx, *row))
+
+        if errors:
+            # Still validate the well-formed rows so every error is reported at once.
+            log.errors = errors + validate_resit_rows(course, rows)[2]
+            return {'errors': log.errors, 'inserted': 0, 'updated': 0, 'unchanged': 0}
+
+        result = bulk_save_resit_grades(course, rows)
+        log.errors = result['errors']
+    return result
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from exams.benchmarks import create_synthetic_data, describe_database, grade_page_throughput, isolated_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure student grade page throughput against a throwaway copy of the configured "
+        "database. Run it once per DJANGO_DB_* configuration to compare backends."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courses', type=int, default=10)
+        parser.add_argument('--students', type=int, default=200)
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--requests', type=int, default=50, help="Requests per reader thread.")
+        parser.add_argument('--writers', type=int, default=1, help="Concurrent writer threads.")
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            profile_ids = create_synthetic_data(courses=options['courses'], students=options['students'])
+            database = describe_database()
+            result = grade_page_throughput(
+                profile_ids,
+                threads=options['threads'],
+                requests_per_thread=options['requests'],
+                writers=options['writers'],
+            )
+
+        self.stdout.write(", ".join(f"{key}={value}" for key, value in database.items()))
+        self.stdout.write(
+            f"{result['requests']} requests in {result['elapsed_seconds']}s: "
+            f"{result['requests_per_second']} req/s, p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, "
+            f"{result['writes']} writes, {result['failures']} failures"
+        )
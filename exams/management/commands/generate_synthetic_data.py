@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from exams.benchmarks import BENCHMARK_PASSWORD, create_staff_account, create_synthetic_data
+from exams.models import Course
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the configured database with synthetic courses, resit schedules, students, "
+        "grades and resit declarations for manual load testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courses', type=int, default=20)
+        parser.add_argument('--students', type=int, default=500)
+        parser.add_argument('--grades-per-student', type=int, default=6)
+        parser.add_argument('--resit-ratio', type=float, default=0.2)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if Course.objects.filter(code__startswith='BN').exists():
+            raise CommandError("Synthetic data already exists (courses BN###); use a fresh database.")
+
+        with transaction.atomic():
+            profile_ids = create_synthetic_data(
+                courses=options['courses'],
+                students=options['students'],
+                grades_per_student=options['grades_per_student'],
+                resit_ratio=options['resit_ratio'],
+                seed=options['seed'],
+            )
+            for role in ('instructor', 'faculty'):
+                create_staff_account(role)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {options['courses']} courses and {len(profile_ids)} students. "
+            f"Log in as bench0@example.com, bench-instructor@example.com or "
+            f"bench-faculty@example.com with password '{BENCHMARK_PASSWORD}'."
+        ))
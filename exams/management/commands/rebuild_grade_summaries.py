@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from exams.models import StudentGradeSummary
+from exams.utils import refresh_grade_summaries
+from users.models import StudentProfile
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-student grade summary table from the Grade rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        student_ids = list(StudentProfile.objects.values_list('id', flat=True))
+        with transaction.atomic():
+            StudentGradeSummary.objects.all().delete()
+            refresh_grade_summaries(student_ids, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt grade summaries for {len(student_ids)} students."))
@@ -0,0 +1,61 @@
+import json
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from exams.benchmarks import SCENARIOS, isolated_database, run_suite
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the timing and query-count benchmarks against synthetic data in a throwaway "
+        "database and print the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenarios', nargs='*', help=f"Subset to run (default: all of {', '.join(SCENARIOS)}).")
+        parser.add_argument('--courses', type=int, default=20)
+        parser.add_argument('--students', type=int, default=500)
+        parser.add_argument('--grades-per-student', type=int, default=6)
+        parser.add_argument('--resit-ratio', type=float, default=0.2)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--upload-rows', type=int, default=50, help="Rows per uploaded grade/student sheet.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--fast-hashers', action='store_true',
+            help="Hash uploaded students' passwords with MD5 so upload_excel_students measures the import, not the hasher.",
+        )
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        unknown = set(options['scenarios']) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        hashers = (
+            override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+            if options['fast_hashers'] else nullcontext()
+        )
+        with isolated_database(), hashers:
+            report = run_suite(
+                scenarios=options['scenarios'],
+                courses=options['courses'],
+                students=options['students'],
+                grades_per_student=options['grades_per_student'],
+                resit_ratio=options['resit_ratio'],
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                upload_rows=options['upload_rows'],
+                seed=options['seed'],
+            )
+        report['fast_hashers'] = options['fast_hashers']
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(f"Wrote benchmark report to {options['output']}")
+        else:
+            self.stdout.write(output)
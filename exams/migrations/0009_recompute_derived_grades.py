@@ -0,0 +1,60 @@
+from bisect import bisect_right
+
+from django.db import migrations
+
+# Frozen copy of the grading rules in exams.utils as of this migration.
+MIDTERM_WEIGHT = 0.4
+FINAL_WEIGHT = 0.6
+MAX_ABSENCES = 3
+LETTER_THRESHOLDS = [55, 60, 65, 70, 75, 80, 85, 90]
+LETTERS = ['FF', 'FD', 'DD', 'DC', 'CC', 'CB', 'BB', 'BA', 'AA']
+RESIT_ELIGIBLE_LETTERS = frozenset(['DD', 'FD', 'FF'])
+DERIVED_FIELDS = ['final_grade', 'letter_grade', 'eligibility', 'resit_final_grade', 'resit_letter_grade']
+BATCH_SIZE = 500
+
+
+def derive(grade):
+    failed_attendance = grade.absences is not None and grade.absences > MAX_ABSENCES
+
+    if grade.midterm_grade is None or grade.final_exam_grade is None:
+        grade.final_grade = None
+        grade.letter_grade = 'DZ' if failed_attendance else None
+    else:
+        grade.final_grade = grade.midterm_grade * MIDTERM_WEIGHT + grade.final_exam_grade * FINAL_WEIGHT
+        grade.letter_grade = 'DZ' if failed_attendance else LETTERS[bisect_right(LETTER_THRESHOLDS, grade.final_grade)]
+    grade.eligibility = 'Eligible' if grade.letter_grade in RESIT_ELIGIBLE_LETTERS else 'Not Eligible'
+
+    if grade.resit_exam_grade is None or grade.midterm_grade is None:
+        grade.resit_final_grade = None
+        grade.resit_letter_grade = None
+    else:
+        grade.resit_final_grade = grade.midterm_grade * MIDTERM_WEIGHT + grade.resit_exam_grade * FINAL_WEIGHT
+        grade.resit_letter_grade = (
+            'DZ' if failed_attendance else LETTERS[bisect_right(LETTER_THRESHOLDS, grade.resit_final_grade)]
+        )
+
+
+def recompute_derived_fields(apps, schema_editor):
+    # The student grade page used to fill these in on every view; now they are
+    # written together with their inputs, so bring existing rows up to date once.
+    Grade = apps.get_model('exams', 'Grade')
+    batch = []
+    for grade in Grade.objects.all().iterator(chunk_size=BATCH_SIZE):
+        derive(grade)
+        batch.append(grade)
+        if len(batch) == BATCH_SIZE:
+            Grade.objects.bulk_update(batch, DERIVED_FIELDS)
+            batch = []
+    if batch:
+        Grade.objects.bulk_update(batch, DERIVED_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0008_remove_grade_resit_used'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_derived_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2 on 2026-10-18 17:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of exams.utils.LETTER_TO_GPA as of this migration.
+LETTER_TO_GPA = {
+    'AA': 4.0, 'BA': 3.5, 'BB': 3.0,
+    'CB': 2.5, 'CC': 2.0, 'DC': 1.5,
+    'DD': 1.0, 'FD': 0.5, 'FF': 0.0, 'DZ': 0.0,
+}
+
+
+def build_summaries(apps, schema_editor):
+    Grade = apps.get_model('exams', 'Grade')
+    StudentGradeSummary = apps.get_model('exams', 'StudentGradeSummary')
+
+    stats = {}
+    rows = Grade.objects.values_list('student_id', 'letter_grade', 'resit_exam_grade', 'resit_letter_grade')
+    for student_id, letter, resit_exam_grade, resit_letter in rows:
+        effective = resit_letter if resit_exam_grade is not None else letter
+        entry = stats.setdefault(student_id, [0.0, 0, 0, 0])
+        entry[0] += LETTER_TO_GPA.get(effective, 0.0)
+        entry[1] += 1
+        entry[2] += resit_exam_grade is not None
+        entry[3] += effective == 'DZ'
+
+    StudentGradeSummary.objects.bulk_create([
+        StudentGradeSummary(
+            student_id=student_id,
+            gpa=round(points / courses, 2),
+            course_count=courses,
+            resit_count=resits,
+            dz_count=dz,
+        )
+        for student_id, (points, courses, resits, dz) in stats.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0009_recompute_derived_grades'),
+        ('users', '0003_remove_studentprofile_years_paid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentGradeSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gpa', models.FloatField(blank=True, null=True)),
+                ('course_count', models.PositiveIntegerField(default=0)),
+                ('resit_count', models.PositiveIntegerField(default=0)),
+                ('dz_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='grade_summary', to='users.studentprofile')),
+            ],
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
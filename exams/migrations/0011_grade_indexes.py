@@ -0,0 +1,88 @@
+# Generated by Django 5.2 on 2026-10-18 17:46
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+# Frozen copy of exams.utils.LETTER_TO_GPA as of this migration.
+LETTER_TO_GPA = {
+    'AA': 4.0, 'BA': 3.5, 'BB': 3.0,
+    'CB': 2.5, 'CC': 2.0, 'DC': 1.5,
+    'DD': 1.0, 'FD': 0.5, 'FF': 0.0, 'DZ': 0.0,
+}
+
+
+def rebuild_summaries(apps, student_ids):
+    Grade = apps.get_model('exams', 'Grade')
+    StudentGradeSummary = apps.get_model('exams', 'StudentGradeSummary')
+
+    stats = {student_id: [0.0, 0, 0, 0] for student_id in student_ids}
+    rows = Grade.objects.filter(student_id__in=student_ids).values_list(
+        'student_id', 'letter_grade', 'resit_exam_grade', 'resit_letter_grade'
+    )
+    for student_id, letter, resit_exam_grade, resit_letter in rows:
+        effective = resit_letter if resit_exam_grade is not None else letter
+        entry = stats[student_id]
+        entry[0] += LETTER_TO_GPA.get(effective, 0.0)
+        entry[1] += 1
+        entry[2] += resit_exam_grade is not None
+        entry[3] += effective == 'DZ'
+
+    StudentGradeSummary.objects.filter(student_id__in=student_ids).delete()
+    StudentGradeSummary.objects.bulk_create([
+        StudentGradeSummary(
+            student_id=student_id,
+            gpa=round(points / courses, 2) if courses else None,
+            course_count=courses,
+            resit_count=resits,
+            dz_count=dz,
+        )
+        for student_id, (points, courses, resits, dz) in stats.items()
+    ], batch_size=500)
+
+
+def remove_duplicate_grades(apps, schema_editor):
+    # Keep the most recent row of any (student, course) pair before the unique constraint is added.
+    Grade = apps.get_model('exams', 'Grade')
+    duplicates = (
+        Grade.objects.values('student_id', 'course_id')
+        .annotate(rows=Count('id'), keep=Max('id'))
+        .filter(rows__gt=1)
+    )
+    student_ids = set()
+    for duplicate in duplicates:
+        Grade.objects.filter(
+            student_id=duplicate['student_id'], course_id=duplicate['course_id']
+        ).exclude(id=duplicate['keep']).delete()
+        student_ids.add(duplicate['student_id'])
+
+    if student_ids:
+        rebuild_summaries(apps, student_ids)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0010_studentgradesummary'),
+        ('users', '0003_remove_studentprofile_years_paid'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_grades, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['course', 'declared_resit'], name='grade_course_resit_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['declared_resit', 'id'], name='grade_resit_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['eligibility', 'id'], name='grade_eligibility_id_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='grade',
+            constraint=models.UniqueConstraint(fields=('student', 'course'), name='unique_grade_per_student_course'),
+        ),
+    ]
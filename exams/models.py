@@ -22,9 +22,31 @@ class Grade(models.Model):
     resit_exam_grade = models.FloatField(null=True, blank=True)
     resit_final_grade = models.FloatField(null=True, blank=True)  # GPA from resit
     resit_letter_grade = models.CharField(max_length=2, null=True, blank=True)
-    
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'course'], name='unique_grade_per_student_course'),
+        ]
+        indexes = [
+            # resit rosters and the resit table of insexam, per course
+            models.Index(fields=['course', 'declared_resit'], name='grade_course_resit_idx'),
+            # insexam listings filtered by resit/eligibility, paged on id
+            models.Index(fields=['declared_resit', 'id'], name='grade_resit_id_idx'),
+            models.Index(fields=['eligibility', 'id'], name='grade_eligibility_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.user.email} - {self.course.code} - {self.letter_grade}"
 
 
+class StudentGradeSummary(models.Model):
+    """Per-student GPA and grade counts, kept in sync with the student's Grade rows."""
+    student = models.OneToOneField(StudentProfile, on_delete=models.CASCADE, related_name='grade_summary')
+    gpa = models.FloatField(null=True, blank=True)
+    course_count = models.PositiveIntegerField(default=0)
+    resit_count = models.PositiveIntegerField(default=0)
+    dz_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.student.user.email} - GPA {self.gpa}"
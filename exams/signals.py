@@ -0,0 +1,36 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import StudentProfile
+from .catalog import invalidate_catalog
+from .models import Course, Grade
+from .utils import refresh_grade_summaries
+
+# Fields that feed StudentGradeSummary; saves touching none of them are skipped.
+SUMMARY_SOURCE_FIELDS = {'letter_grade', 'resit_exam_grade', 'resit_letter_grade'}
+
+
+@receiver(post_save, sender=Grade)
+def update_summary_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not SUMMARY_SOURCE_FIELDS & set(update_fields):
+        return
+    refresh_grade_summaries([instance.student_id])
+
+
+@receiver(post_delete, sender=Grade)
+def update_summary_on_delete(sender, instance, **kwargs):
+    # Grades are also deleted when their student is; wait for the commit and
+    # skip students that no longer exist instead of recreating their summary.
+    student_id = instance.student_id
+    transaction.on_commit(lambda: refresh_grade_summaries(
+        StudentProfile.objects.filter(id=student_id).values_list('id', flat=True)
+    ))
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course_catalog(sender, **kwargs):
+    # Again on commit, in case another process reloaded before the change was visible.
+    invalidate_catalog()
+    transaction.on_commit(invalidate_catalog)
@@ -1,6 +1,5 @@
 # yourapp/templatetags/querystring.py
 from django import template
-from urllib.parse import urlencode
 
 register = template.Library()
 
@@ -9,9 +8,13 @@ def querystring_replace(context, **kwargs):
     """
     Allows query string manipulation from templates.
     Example: {% querystring_replace page2=2 %}
+    Passing None drops the parameter: {% querystring_replace cursor=None %}
     """
     request = context['request']
     query = request.GET.copy()
     for key, value in kwargs.items():
-        query[key] = value
-    return '?' + urlencode(query)
+        if value is None:
+            query.pop(key, None)
+        else:
+            query[key] = value
+    return '?' + query.urlencode()
@@ -1,14 +1,25 @@
 
 # Create your tests here.
-from django.test import TestCase, Client
+import json
+import re
+from unittest import skipUnless
+
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from users.models import StudentProfile
-from .models import Course, Grade
-from .utils import save_grade, get_letter_grade, determine_eligibility
+from .catalog import VERSION_KEY, get_catalog, get_course, resolve_codes
+from .benchmarks import BENCHMARK_PASSWORD, SCENARIOS, create_synthetic_data, run_suite, summarize_timings
+from .models import Course, Grade, StudentGradeSummary
+from .utils import SAVED_FIELDS, apply_computed_grades, bulk_save_grades, bulk_save_resit_grades, compute_grades, save_grade, get_letter_grade, determine_eligibility
 import openpyxl
-from io import BytesIO
+from io import BytesIO, StringIO
 
 class CourseModelTests(TestCase):
     def test_course_creation(self):
@@ -36,6 +47,64 @@ class CourseModelTests(TestCase):
         with self.assertRaises(Exception):
             Course.objects.create(code="TC102", name=long_name)
 
+class CourseCatalogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.course = Course.objects.create(code="TC101", name="Test Course")
+
+    def test_catalog_is_loaded_once(self):
+        """Test the catalog maps codes and ids and is served from memory after the first read"""
+        with self.assertNumQueries(1):
+            catalog = get_catalog()
+        self.assertEqual(catalog.by_code['TC101'], (self.course.id, 'TC101', 'Test Course'))
+        with self.assertNumQueries(0):
+            course = get_course(self.course.id)
+            self.assertIs(get_catalog(), catalog)
+        self.assertEqual(course, self.course)
+        self.assertEqual(Grade.objects.filter(course=course).count(), 0)
+        with self.assertRaises(Course.DoesNotExist):
+            get_course(self.course.id + 1)
+
+    def test_course_changes_invalidate_the_catalog(self):
+        """Test saving or deleting a course, or a new shared version, reloads the catalog"""
+        get_catalog()
+        self.course.name = "Renamed"
+        self.course.save()
+        self.assertEqual(get_catalog().by_code['TC101'].name, "Renamed")
+
+        Course.objects.create(code="TC102", name="Other")
+        self.course.delete()
+        self.assertEqual([course.code for course in get_catalog()], ['TC102'])
+
+        # Another process changed a course.
+        Course.objects.filter(code="TC102").update(name="Updated")
+        cache.set(VERSION_KEY, 'other-process')
+        self.assertEqual(get_catalog().by_code['TC102'].name, "Updated")
+
+
+    def test_course_created_elsewhere_falls_back_to_the_database(self):
+        """Test a course missing from the snapshot is read from the database and can be uploaded to"""
+        get_catalog()
+        # Created without signals, as by another process with its own cache.
+        Course.objects.bulk_create([Course(code="TC102", name="New Course")])
+        course = Course.objects.get(code="TC102")
+
+        self.assertEqual(resolve_codes({'TC102', 'XX999'}), {'TC102': (course.id, 'TC102', 'New Course')})
+        self.assertEqual(get_course(course.id), course)
+        self.assertIn('TC102', get_catalog().by_code)
+        with self.assertRaises(Course.DoesNotExist):
+            get_course(course.id + 1)
+
+        Course.objects.bulk_create([Course(code="TC103", name="Newer Course")])
+        course = Course.objects.get(code="TC103")
+        user = User.objects.create_user(username='s1', email='s1@example.com')
+        StudentProfile.objects.create(user=user)
+        sheet = SimpleUploadedFile('grades.csv', b"email,midterm,final_exam,absences\ns1@example.com,70,80,0\n")
+        response = self.client.post(reverse('upload_grades', args=[course.id]), {'grade_file': sheet})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Grade.objects.filter(course=course).exists())
+
+
 class GradeModelTests(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(username='student', password='studentpass123')
@@ -105,6 +174,27 @@ class UtilsTests(TestCase):
         self.assertEqual(determine_eligibility("CC"), "Not Eligible")
         self.assertEqual(determine_eligibility("AA"), "Not Eligible")
 
+    def test_compute_grades(self):
+        """Test compute_grades grades whole columns at once"""
+        computed = compute_grades(
+            [80, 50, 60, None],
+            [85, 50, 90, 70],
+            [2, 0, 4, 0],
+            [None, 70, 95, None],
+        )
+        self.assertEqual(computed['final_grade'], [83.0, 50.0, 78.0, None])
+        self.assertEqual(computed['letter_grade'], ["BB", "FF", "DZ", None])
+        self.assertEqual(computed['eligibility'], ["Not Eligible", "Eligible", "Not Eligible", "Not Eligible"])
+        self.assertEqual(computed['resit_final_grade'], [None, 62.0, 81.0, None])
+        self.assertEqual(computed['resit_letter_grade'], [None, "DD", "DZ", None])
+
+    def test_compute_grades_matches_letter_boundaries(self):
+        """Test compute_grades agrees with get_letter_grade at every band edge"""
+        scores = [0, 54.99, 55, 59.99, 60, 65, 70, 75, 80, 85, 89.99, 90, 100]
+        computed = compute_grades(scores, scores, [0] * len(scores))
+        expected = [get_letter_grade(score) for score in scores]
+        self.assertEqual(computed['letter_grade'], expected)
+
     def test_save_grade(self):
         """Test save_grade function"""
         save_grade(self.student, self.course, 80, 85, 2)
@@ -123,6 +213,194 @@ class UtilsTests(TestCase):
         self.assertEqual(grade.letter_grade, "DZ")
         self.assertEqual(grade.eligibility, "Not Eligible")
 
+    def test_bulk_save_grades(self):
+        """Test bulk_save_grades creates and updates grades with their derived fields"""
+        other_user = User.objects.create_user(username='other', password='otherpass123', email='other@example.com')
+        other = StudentProfile.objects.create(user=other_user)
+        self.user.email = 'student@example.com'
+        self.user.save()
+        save_grade(self.student, self.course, 50, 50, 0)
+
+        result = bulk_save_grades(self.course, [
+            (2, 'student@example.com', 80, 85, 2),
+            (3, ' other@example.com ', 60, 60, 5),
+        ])
+
+        self.assertEqual(result, {'errors': [], 'inserted': 1, 'updated': 1, 'unchanged': 0})
+        grade = Grade.objects.get(student=self.student, course=self.course)
+        self.assertEqual(grade.final_grade, 83.0)
+        self.assertEqual(grade.letter_grade, "BB")
+        other_grade = Grade.objects.get(student=other, course=self.course)
+        self.assertEqual(other_grade.letter_grade, "DZ")
+        self.assertEqual(other_grade.eligibility, "Not Eligible")
+
+    def test_bulk_save_grades_is_all_or_nothing(self):
+        """Test one invalid row rejects the whole sheet and every error is reported"""
+        self.user.email = 'student@example.com'
+        self.user.save()
+        save_grade(self.student, self.course, 50, 50, 0)
+
+        errors = bulk_save_grades(self.course, [
+            (2, 'student@example.com', 80, 85, 0),
+            (3, 'missing@example.com', 70, 70, 0),
+            (4, 'student@example.com', 90, 90, 0),
+            (5, 'another@example.com', 101, 70, 0),
+            (6, 'another2@example.com', 'abc', 70, 0),
+            (7, 'another3@example.com', 70, 70, 1.5),
+            (8, None, 70, 70, 0),
+        ])['errors']
+
+        self.assertEqual(errors, [
+            "Row 3: StudentProfile not found for email: missing@example.com",
+            "Row 4: Duplicate row for email: student@example.com (first seen in row 2)",
+            "Row 5: Midterm grade must be between 0 and 100: 101",
+            "Row 6: Invalid midterm grade: abc",
+            "Row 7: Absences must be a whole number of 0 or more: 1.5",
+            "Row 8: Incomplete data in row: (None, 70, 70)",
+        ])
+        self.assertEqual(Grade.objects.get(student=self.student, course=self.course).midterm_grade, 50)
+
+    def test_bulk_save_grades_query_count(self):
+        """Test bulk_save_grades does not issue queries per row"""
+        rows = []
+        for i in range(20):
+            user = User.objects.create_user(username=f's{i}', email=f's{i}@example.com')
+            StudentProfile.objects.create(user=user)
+            rows.append((i + 2, f's{i}@example.com', 70, 70, 0))
+        # profiles, existing grades, savepoint, bulk insert, summary read, summary upsert, release
+        with self.assertNumQueries(7):
+            result = bulk_save_grades(self.course, rows)
+        self.assertEqual(result['errors'], [])
+        self.assertEqual(Grade.objects.filter(course=self.course).count(), 20)
+
+    def test_bulk_save_grades_writes_only_changed_rows(self):
+        """Test re-uploading a sheet only writes the rows that changed"""
+        rows = []
+        for i in range(10):
+            user = User.objects.create_user(username=f's{i}', email=f's{i}@example.com')
+            StudentProfile.objects.create(user=user)
+            rows.append((i + 2, f's{i}@example.com', 70, 70, 0))
+        bulk_save_grades(self.course, rows)
+
+        # profiles, existing grades; nothing to write
+        with self.assertNumQueries(2):
+            result = bulk_save_grades(self.course, rows)
+        self.assertEqual(result, {'errors': [], 'inserted': 0, 'updated': 0, 'unchanged': 10})
+
+        rows[3] = (5, 's3@example.com', 85, 85, 0)
+        with CaptureQueriesContext(connection) as queries:
+            result = bulk_save_grades(self.course, rows)
+        self.assertEqual(result, {'errors': [], 'inserted': 0, 'updated': 1, 'unchanged': 9})
+        update = next(q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "exams_grade"'))
+        # one CASE branch per field: only the changed grade is in the UPDATE
+        self.assertEqual(update.count('WHEN'), len(SAVED_FIELDS))
+        self.assertEqual(Grade.objects.get(student__user__email='s3@example.com').letter_grade, 'BA')
+
+    def test_bulk_save_resit_grades(self):
+        """Test resit grades are graded in one pass and only the resit fields are written"""
+        rows = []
+        for i in range(10):
+            user = User.objects.create_user(username=f's{i}', email=f's{i}@example.com')
+            save_grade(StudentProfile.objects.create(user=user), self.course, 50, 50, 0)
+            rows.append((i + 2, f's{i}@example.com', 90))
+        # profiles, grades, savepoint, bulk update, summary read, summary upsert, release
+        with CaptureQueriesContext(connection) as queries:
+            result = bulk_save_resit_grades(self.course, rows)
+        self.assertEqual(len(queries.captured_queries), 7)
+        self.assertEqual(result, {'errors': [], 'inserted': 0, 'updated': 10, 'unchanged': 0})
+        update = next(q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "exams_grade"'))
+        self.assertNotIn('"letter_grade" =', update)
+
+        grade = Grade.objects.get(student__user__email='s0@example.com', course=self.course)
+        self.assertEqual((grade.resit_final_grade, grade.resit_letter_grade, grade.letter_grade), (74.0, 'CC', 'FF'))
+        self.assertEqual(StudentGradeSummary.objects.get(student=grade.student).gpa, 2.0)
+
+class StudentGradeSummaryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='student', email='student@example.com')
+        self.student = StudentProfile.objects.create(user=self.user)
+        self.course = Course.objects.create(code="TC101", name="Test Course")
+        self.course2 = Course.objects.create(code="TC102", name="Another Course")
+
+    def test_summary_follows_saved_grades(self):
+        """Test the summary is updated when grades are saved"""
+        save_grade(self.student, self.course, 95, 95, 0)  # AA
+        save_grade(self.student, self.course2, 60, 60, 5)  # DZ
+        summary = StudentGradeSummary.objects.get(student=self.student)
+        self.assertEqual(summary.gpa, 2.0)
+        self.assertEqual(summary.course_count, 2)
+        self.assertEqual(summary.dz_count, 1)
+        self.assertEqual(summary.resit_count, 0)
+
+    def test_summary_uses_resit_letter(self):
+        """Test a taken resit replaces the original letter in the summary"""
+        bulk_save_grades(self.course, [(2, 'student@example.com', 50, 50, 0)])  # FF
+        self.assertEqual(StudentGradeSummary.objects.get(student=self.student).gpa, 0.0)
+        grade = Grade.objects.get(student=self.student, course=self.course)
+        grade.resit_exam_grade = 90
+        apply_computed_grades([grade])
+        grade.save()  # resit 74 -> CC
+        summary = StudentGradeSummary.objects.get(student=self.student)
+        self.assertEqual(summary.gpa, 2.0)
+        self.assertEqual(summary.resit_count, 1)
+
+    def test_summary_follows_deleted_grades(self):
+        """Test deleting a grade updates the summary on commit"""
+        save_grade(self.student, self.course, 95, 95, 0)
+        save_grade(self.student, self.course2, 50, 50, 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            Grade.objects.get(course=self.course2).delete()
+        summary = StudentGradeSummary.objects.get(student=self.student)
+        self.assertEqual(summary.gpa, 4.0)
+        self.assertEqual(summary.course_count, 1)
+
+    def test_deleting_student_drops_summary(self):
+        """Test deleting a student with grades does not recreate its summary"""
+        save_grade(self.student, self.course, 95, 95, 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertFalse(StudentGradeSummary.objects.exists())
+
+    def test_rebuild_grade_summaries_command(self):
+        """Test the rebuild command recreates summaries from scratch"""
+        save_grade(self.student, self.course, 80, 85, 0)
+        StudentGradeSummary.objects.all().delete()
+        call_command('rebuild_grade_summaries', stdout=StringIO())
+        self.assertEqual(StudentGradeSummary.objects.get(student=self.student).gpa, 3.0)
+
+@skipUnless(connection.vendor == 'sqlite', "Plan assertions are written against SQLite's EXPLAIN QUERY PLAN output")
+class GradeQueryPlanTests(TestCase):
+    """The hot Grade queries must be answered from an index, never a full table scan."""
+
+    def setUp(self):
+        user = User.objects.create_user(username='student', email='student@example.com')
+        self.student = StudentProfile.objects.create(user=user)
+        self.course = Course.objects.create(code="TC101", name="Test Course")
+        Grade.objects.create(student=self.student, course=self.course, eligibility="Eligible")
+
+    def assertNoTableScan(self, queryset):
+        plan = queryset.explain()
+        scans = [line for line in plan.splitlines() if re.search(r'\bSCAN\b', line)]
+        self.assertEqual(scans, [], f"Query degraded to a scan:\n{plan}\n{queryset.query}")
+
+    def test_grade_by_student_and_course(self):
+        self.assertNoTableScan(Grade.objects.filter(student=self.student, course=self.course))
+        self.assertNoTableScan(Grade.objects.filter(student=self.student, course__code="TC101"))
+
+    def test_grades_by_student(self):
+        self.assertNoTableScan(Grade.objects.filter(student=self.student).select_related('course'))
+
+    def test_resit_roster_by_course_code(self):
+        self.assertNoTableScan(Grade.objects.filter(course__code="TC101", declared_resit=True))
+
+    def test_insexam_listings(self):
+        self.assertNoTableScan(Grade.objects.filter(declared_resit=True, id__gt=0).order_by('id')[:6])
+        self.assertNoTableScan(Grade.objects.filter(eligibility="Eligible", id__gt=0).order_by('id')[:6])
+        self.assertNoTableScan(Grade.objects.filter(course__code="TC101").order_by('id')[:6])
+
+    def test_eligibility_filter(self):
+        self.assertNoTableScan(Grade.objects.filter(eligibility="Eligible"))
+
 class ExamsViewTests(TestCase):
     def setUp(self):
         self.client = Client()
@@ -153,6 +431,25 @@ class ExamsViewTests(TestCase):
         self.assertEqual(len(response.context['original_grades']), 1)
         self.assertEqual(response.context['gpa'], 1.0)  # DD = 1.0 GPA
 
+    def test_studentgrade_view_is_read_only(self):
+        """Test studentgrade view does not write to the database"""
+        self.client.login(username='student', password='studentpass123')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('studentgrade'))
+        self.assertEqual(response.status_code, 200)
+        writes = [q['sql'] for q in queries if q['sql'].startswith(('UPDATE "exams_grade"', 'INSERT INTO "exams_grade"'))]
+        self.assertEqual(writes, [])
+
+    def test_studentgrade_view_reads_profile_with_summary(self):
+        """Test studentgrade loads the profile together with its GPA summary, then the grades"""
+        self.client.login(username='student', password='studentpass123')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('studentgrade'))
+        self.assertEqual(response.context['gpa'], 1.0)
+        tables = [q['sql'] for q in queries if '"users_studentprofile"' in q['sql'] or '"exams_grade"' in q['sql']]
+        self.assertEqual(len(tables), 2)
+        self.assertIn('"exams_studentgradesummary"', tables[0])
+
     def test_studentgrade_view_no_profile(self):
         """Test studentgrade view redirects for user without student profile"""
         user = User.objects.create_user(username='noprofile', password='noprofile123')
@@ -173,6 +470,55 @@ class ExamsViewTests(TestCase):
         self.assertEqual(response.context['selected_course'], 'TC101')
         self.assertEqual(response.context['selected_eligibility'], 'Eligible')
 
+    def test_insexam_query_count_does_not_grow_with_rows(self):
+        """Test insexam renders both grade tables without per-row queries"""
+        for i in range(6):
+            user = User.objects.create_user(username=f's{i}', email=f's{i}@example.com')
+            profile = StudentProfile.objects.create(user=user)
+            course = Course.objects.create(code=f"TC2{i}", name=f"Course {i}")
+            Grade.objects.create(student=profile, course=course, eligibility="Eligible", declared_resit=True)
+
+        # course catalog (first render only), then a count and a page for each of the two tables
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('insexam'))
+        self.assertEqual(len(response.context['students']), 5)
+        self.assertEqual(len(response.context['students2']), 5)
+
+        cursors = {
+            'cursor': response.context['page_obj'].next_cursor,
+            'cursor2': response.context['page_obj2'].next_cursor,
+        }
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('insexam'), cursors)
+        self.assertEqual(len(response.context['students']), 2)
+        self.assertEqual(len(response.context['students2']), 2)
+
+    @override_settings(FRAGMENT_CACHE={'TIMEOUT': 60, 'VERSION': 'test'})
+    def test_insexam_course_dropdowns_are_cached_per_catalog_version(self):
+        """Test the cached course dropdowns keep the selection and show new courses"""
+        cache.clear()
+        response = self.client.get(reverse('insexam'), {'course': 'TC101'})
+        self.assertContains(response, '<option value="TC101" selected>TC101</option>', html=True)
+        response = self.client.get(reverse('insexam'))
+        self.assertContains(response, '<option value="TC101">TC101</option>', html=True)
+        version = response.context['courses'].version
+        self.assertIsNotNone(cache.get(make_template_fragment_key('insexam_resit_list', [version])))
+
+        Course.objects.create(code="TC102", name="Another Course")
+        response = self.client.get(reverse('insexam'))
+        self.assertContains(response, '<option value="TC102">TC102</option>', html=True)
+
+    @override_settings(FRAGMENT_CACHE={'TIMEOUT': 60, 'VERSION': 'test'})
+    def test_insexam_unknown_course_filter_adds_no_cache_entries(self):
+        """Test arbitrary course values in the query string share the unselected dropdown fragment"""
+        cache.clear()
+        self.client.get(reverse('insexam'))
+        entries = len(cache._cache)
+        for i in range(5):
+            response = self.client.get(reverse('insexam'), {'course': f'junk{i}', 'course2': f'junk{i}'})
+            self.assertEqual(response.context['selected_course'], '')
+        self.assertEqual(len(cache._cache), entries)
+
     def test_resitgrades_view(self):
         """Test resitgrades view renders correctly"""
         response = self.client.get(reverse('resitgrades'))
@@ -243,7 +589,7 @@ class ExamsViewTests(TestCase):
             format='multipart'
         )
         self.assertEqual(response.status_code, 200)
-        self.assertJSONEqual(response.content, {'status': 'success'})
+        self.assertJSONEqual(response.content, {'status': 'success', 'inserted': 0, 'updated': 1, 'unchanged': 0})
         grade = Grade.objects.get(student=self.student, course=self.course)
         self.assertEqual(grade.midterm_grade, 80)
         self.assertEqual(grade.final_exam_grade, 85)
@@ -270,9 +616,58 @@ class ExamsViewTests(TestCase):
             format='multipart'
         )
         self.assertEqual(response.status_code, 200)
-        self.assertJSONEqual(response.content, {'status': 'success'})
+        self.assertJSONEqual(response.content, {'status': 'success', 'inserted': 0, 'updated': 1, 'unchanged': 0})
         grade = Grade.objects.get(student=self.student, course=self.course)
         self.assertEqual(grade.resit_exam_grade, 90)
+        self.assertEqual(grade.resit_final_grade, 78.0)  # 60*0.4 + 90*0.6
+        self.assertEqual(grade.resit_letter_grade, "CB")
+
+    def test_upload_grades_resit_rejects_invalid_sheet(self):
+        """Test a resit sheet with any bad row reports every error and saves nothing"""
+        uploaded_file = SimpleUploadedFile(
+            "test.csv",
+            b"email,resit_grade\nstudent@example.com,90\nnobody@example.com,70\nstudent@example.com,120\n",
+            content_type="text/csv"
+        )
+        response = self.client.post(
+            reverse('upload_grades', args=[self.course.id]),
+            {'grade_file': uploaded_file, 'upload_type': 'resit'},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], [
+            "Row 3: StudentProfile not found for email: nobody@example.com",
+            "Row 4: Duplicate row for email: student@example.com (first seen in row 2)",
+        ])
+        self.assertIsNone(Grade.objects.get(student=self.student, course=self.course).resit_exam_grade)
+
+    def test_upload_grades_regular_csv(self):
+        """Test upload_grades accepts a CSV file"""
+        uploaded_file = SimpleUploadedFile(
+            "test.csv",
+            b"email,midterm,final_exam,absences\nstudent@example.com,80,85,2\n",
+            content_type="text/csv"
+        )
+        response = self.client.post(
+            reverse('upload_grades', args=[self.course.id]),
+            {'grade_file': uploaded_file, 'upload_type': 'regular'},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, 200)
+        grade = Grade.objects.get(student=self.student, course=self.course)
+        self.assertEqual(grade.letter_grade, "BB")
+
+    def test_upload_grades_logs_import_summary(self):
+        """Test a grade upload writes one summary record instead of printing rows"""
+        uploaded_file = SimpleUploadedFile(
+            "test.csv",
+            b"email,midterm,final_exam\nstudent@example.com,80,85\nmissing@example.com,50,50\n",
+            content_type="text/csv"
+        )
+        with self.assertLogs('exams.importers', 'INFO') as logs:
+            self.client.post(reverse('upload_grades', args=[self.course.id]), {'grade_file': uploaded_file})
+        self.assertEqual(len(logs.records), 1)
+        summary = logs.records[0]
+        self.assertEqual((summary.import_kind, summary.course, summary.rows, summary.errors), ('grades', self.course.code, 2, 1))
 
     def test_upload_grades_invalid_data(self):
         """Test upload_grades with invalid Excel data"""
@@ -293,8 +688,9 @@ class ExamsViewTests(TestCase):
             {'grade_file': uploaded_file, 'upload_type': 'regular'},
             format='multipart'
         )
-        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.status_code, 400)
         self.assertIn('Incomplete data', response.json()['message'])
+        self.assertEqual(len(response.json()['errors']), 1)
 
     def test_download_resit_excel(self):
         """Test download_resit_excel view"""
@@ -303,7 +699,58 @@ class ExamsViewTests(TestCase):
         self.assertEqual(response['Content-Type'], 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
         self.assertEqual(response['Content-Disposition'], 'attachment; filename="TC101_resit_students.xlsx"')
         # Verify Excel content
-        workbook = openpyxl.load_workbook(BytesIO(response.content))
+        workbook = openpyxl.load_workbook(BytesIO(b''.join(response.streaming_content)))
         sheet = workbook.active
         self.assertEqual(sheet['A1'].value, 'Student Email')
         self.assertEqual(sheet['A2'].value, 'student@example.com')
+
+    def test_download_resit_csv_multiple_courses(self):
+        """Test download_resit_excel streams a CSV covering several courses"""
+        other_course = Course.objects.create(code="TC102", name="Other Course")
+        Grade.objects.create(student=self.student, course=other_course, eligibility="Eligible", declared_resit=True)
+        Grade.objects.create(
+            student=StudentProfile.objects.create(user=User.objects.create_user(username='s2', email='s2@example.com')),
+            course=other_course, eligibility="Eligible", declared_resit=False,
+        )
+        response = self.client.get(reverse('download_resit_excel'), {'course_code': 'TC101,TC102', 'format': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="resit_students.csv"')
+        self.assertEqual(b''.join(response.streaming_content).decode().splitlines(), [
+            'Student Email,Course Code',
+            'student@example.com,TC101',
+            'student@example.com,TC102',
+        ])
+
+
+class BenchmarkHelperTests(TestCase):
+    def test_create_synthetic_data(self):
+        """Test synthetic data gives every student graded courses and a summary"""
+        profile_ids = create_synthetic_data(courses=4, students=5, grades_per_student=3)
+        self.assertEqual(len(profile_ids), 5)
+        self.assertEqual(Grade.objects.filter(student_id__in=profile_ids).count(), 15)
+        self.assertEqual(StudentGradeSummary.objects.filter(student_id__in=profile_ids).count(), 5)
+        self.assertFalse(Grade.objects.filter(declared_resit=True).exclude(eligibility='Eligible').exists())
+        self.assertTrue(self.client.login(username='bench0@example.com', password=BENCHMARK_PASSWORD))
+
+    def test_summarize_timings(self):
+        """Test throughput and percentiles are computed from request durations"""
+        result = summarize_timings([0.01 * i for i in range(1, 101)], elapsed=2.0)
+        self.assertEqual(result['requests_per_second'], 50.0)
+        self.assertEqual(result['p50_ms'], 505.0)
+        self.assertEqual(result['p95_ms'], 950.5)
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_run_suite_covers_every_scenario(self):
+        """Test each benchmark scenario succeeds and reports timings and query counts"""
+        report = run_suite(courses=3, students=6, grades_per_student=2, resit_ratio=1.0,
+                           iterations=2, warmup=0, upload_rows=3)
+        self.assertEqual(set(report['results']), set(SCENARIOS))
+        for name, result in report['results'].items():
+            self.assertEqual(result['status_codes'], [200], name)
+            self.assertEqual(result['requests'], 2)
+            self.assertGreater(result['queries'], 0, name)
+        self.assertIn('render_p50_ms', report['results']['insresitexam'])
+        self.assertNotIn('render_p50_ms', report['results']['upload_grades'])
+        self.assertTrue(report['rendering']['cached_loader'])
+        json.dumps(report)
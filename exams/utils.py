@@ -1,41 +1,347 @@
-from exams.models import Grade
-def save_grade(student, course, midterm, final_exam, absences):
-    final_grade = (float(midterm) * 0.4) + (float(final_exam) * 0.6)
-    letter_grade = "DZ" if int(absences) > 3 else get_letter_grade(final_grade)
-    eligibility = determine_eligibility(letter_grade)
+from bisect import bisect_right
+
+from django.db import transaction
+from exams.models import Grade, StudentGradeSummary
+from users.models import StudentProfile
+
+MIDTERM_WEIGHT = 0.4
+FINAL_WEIGHT = 0.6
+MAX_ABSENCES = 3
+MIN_SCORE = 0
+MAX_SCORE = 100
+
+# Lower bound of each letter band, ascending; LETTERS[i] covers [THRESHOLDS[i-1], THRESHOLDS[i]).
+LETTER_THRESHOLDS = [55, 60, 65, 70, 75, 80, 85, 90]
+LETTERS = ['FF', 'FD', 'DD', 'DC', 'CC', 'CB', 'BB', 'BA', 'AA']
+RESIT_ELIGIBLE_LETTERS = frozenset(['DD', 'FD', 'FF'])
+
+LETTER_TO_GPA = {
+    'AA': 4.0, 'BA': 3.5, 'BB': 3.0,
+    'CB': 2.5, 'CC': 2.0, 'DC': 1.5,
+    'DD': 1.0, 'FD': 0.5, 'FF': 0.0, 'DZ': 0.0,
+}
+SUMMARY_FIELDS = ['gpa', 'course_count', 'resit_count', 'dz_count', 'updated_at']
+
+GRADE_FIELDS = ['midterm_grade', 'final_exam_grade', 'final_grade', 'letter_grade', 'eligibility', 'absences']
+DERIVED_FIELDS = ['final_grade', 'letter_grade', 'eligibility', 'resit_final_grade', 'resit_letter_grade']
+RESIT_FIELDS = ['resit_exam_grade', 'resit_final_grade', 'resit_letter_grade']
+# Fields written by bulk_save_grades, without the ones GRADE_FIELDS and DERIVED_FIELDS share.
+SAVED_FIELDS = list(dict.fromkeys(GRADE_FIELDS + DERIVED_FIELDS))
 
-    Grade.objects.update_or_create(
+def save_grade(student, course, midterm, final_exam, absences):
+    grade, created = Grade.objects.get_or_create(
         student=student,
         course=course,
-        defaults={
-            'midterm_grade': midterm,
-            'final_exam_grade': final_exam,
-            'final_grade': final_grade,
-            'letter_grade': letter_grade,
-            'eligibility': eligibility,
-            'absences': absences,
-        }
+        defaults={'eligibility': determine_eligibility(None)},
+    )
+    inputs = (float(midterm), float(final_exam), int(absences))
+    if not created and (grade.midterm_grade, grade.final_exam_grade, grade.absences) == inputs:
+        return grade
+    grade.midterm_grade, grade.final_exam_grade, grade.absences = inputs
+    apply_computed_grades([grade])
+    grade.save()
+    return grade
+
+def apply_computed_grades(grades):
+    """Fill the derived fields of the given Grade instances from their inputs."""
+    computed = compute_grades(
+        [grade.midterm_grade for grade in grades],
+        [grade.final_exam_grade for grade in grades],
+        [grade.absences for grade in grades],
+        [grade.resit_exam_grade for grade in grades],
     )
+    for i, grade in enumerate(grades):
+        for field in DERIVED_FIELDS:
+            setattr(grade, field, computed[field][i])
+    return grades
+
+def refresh_grade_summaries(student_ids, batch_size=500):
+    """
+    Rebuild the StudentGradeSummary rows of the given students from their grades.
+    Bulk writes bypass the Grade signals, so bulk paths call this directly.
+    """
+    student_ids = list(student_ids)
+    for start in range(0, len(student_ids), batch_size):
+        batch = student_ids[start:start + batch_size]
+        stats = {student_id: [0.0, 0, 0, 0] for student_id in batch}
+
+        rows = Grade.objects.filter(student_id__in=batch).values_list(
+            'student_id', 'letter_grade', 'resit_exam_grade', 'resit_letter_grade'
+        )
+        for student_id, letter, resit_exam_grade, resit_letter in rows:
+            # A taken resit replaces the original letter, as on the student grade page.
+            effective = resit_letter if resit_exam_grade is not None else letter
+            entry = stats[student_id]
+            entry[0] += LETTER_TO_GPA.get(effective, 0.0)
+            entry[1] += 1
+            entry[2] += resit_exam_grade is not None
+            entry[3] += effective == 'DZ'
+
+        summaries = [
+            StudentGradeSummary(
+                student_id=student_id,
+                gpa=round(points / courses, 2) if courses else None,
+                course_count=courses,
+                resit_count=resits,
+                dz_count=dz,
+            )
+            for student_id, (points, courses, resits, dz) in stats.items()
+        ]
+        StudentGradeSummary.objects.bulk_create(
+            summaries,
+            update_conflicts=True,
+            unique_fields=['student'],
+            update_fields=SUMMARY_FIELDS,
+        )
 
 def get_letter_grade(score):
-    if score >= 90:
-        return 'AA'
-    elif score >= 85:
-        return 'BA'
-    elif score >= 80:
-        return 'BB'
-    elif score >= 75:
-        return 'CB'
-    elif score >= 70:
-        return 'CC'
-    elif score >= 65:
-        return 'DC'
-    elif score >= 60:
-        return 'DD'
-    elif score >= 55:
-        return 'FD'
-    else:
-        return 'FF'
+    return LETTERS[bisect_right(LETTER_THRESHOLDS, score)]
 
 def determine_eligibility(letter_grade):
-    return "Eligible" if letter_grade in ["DD", "FD", "FF"] else "Not Eligible"
+    return "Eligible" if letter_grade in RESIT_ELIGIBLE_LETTERS else "Not Eligible"
+
+def compute_grades(midterms, finals, absences, resits=None):
+    """
+    Grade a whole column of students in one call.
+    Takes parallel sequences of midterm, final exam, absence and (optionally)
+    resit exam values, and returns a dict of lists keyed by the Grade field
+    they belong to. Missing exam values produce None for the derived fields.
+    """
+    if resits is None:
+        resits = [None] * len(midterms)
+
+    thresholds = LETTER_THRESHOLDS
+    letters = LETTERS
+    final_grades = []
+    letter_grades = []
+    eligibilities = []
+    resit_final_grades = []
+    resit_letter_grades = []
+
+    for midterm, final_exam, absent, resit in zip(midterms, finals, absences, resits):
+        failed_attendance = absent is not None and absent > MAX_ABSENCES
+
+        if midterm is None or final_exam is None:
+            final_grade = None
+            letter = "DZ" if failed_attendance else None
+        else:
+            final_grade = midterm * MIDTERM_WEIGHT + final_exam * FINAL_WEIGHT
+            letter = "DZ" if failed_attendance else letters[bisect_right(thresholds, final_grade)]
+        final_grades.append(final_grade)
+        letter_grades.append(letter)
+        eligibilities.append("Eligible" if letter in RESIT_ELIGIBLE_LETTERS else "Not Eligible")
+
+        if resit is None or midterm is None:
+            resit_final_grades.append(None)
+            resit_letter_grades.append(None)
+        else:
+            resit_final = midterm * MIDTERM_WEIGHT + resit * FINAL_WEIGHT
+            resit_final_grades.append(resit_final)
+            resit_letter_grades.append("DZ" if failed_attendance else letters[bisect_right(thresholds, resit_final)])
+
+    return {
+        'final_grade': final_grades,
+        'letter_grade': letter_grades,
+        'eligibility': eligibilities,
+        'resit_final_grade': resit_final_grades,
+        'resit_letter_grade': resit_letter_grades,
+    }
+
+
+def parse_score(value, label):
+    """Float value of a 0-100 score cell; raises ValueError with a row-ready message otherwise."""
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {label.lower()}: {value}")
+    if not MIN_SCORE <= score <= MAX_SCORE:
+        raise ValueError(f"{label} must be between {MIN_SCORE} and {MAX_SCORE}: {value}")
+    return score
+
+
+def parse_absences(value):
+    """Absence count of a cell (empty means 0); raises ValueError unless it is a whole number >= 0."""
+    if value is None or value == '':
+        return 0
+    try:
+        absences = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid absences: {value}")
+    if absences < 0 or not absences.is_integer():
+        raise ValueError(f"Absences must be a whole number of 0 or more: {value}")
+    return int(absences)
+
+
+def format_row_errors(errors):
+    """(row_number, message) pairs -> "Row N: message" strings in sheet order."""
+    return [f"Row {row_idx}: {message}" for row_idx, message in sorted(errors, key=lambda error: error[0])]
+
+
+def validate_grade_rows(course, rows):
+    """
+    Validate a regular grade sheet for one course without writing anything.
+    `rows` yields (row_number, email, midterm, final_exam, absences) tuples.
+    Returns (grades_to_create, grades_to_update, unchanged, errors): rows whose
+    midterm, final and absences match the stored grade are only counted in
+    `unchanged`; the other grades have their inputs and derived fields set.
+    Errors are "Row N: ..." strings.
+    """
+    errors = []
+    parsed = []
+    first_seen = {}
+    for row_idx, email, midterm, final_exam, absences in rows:
+        email = str(email).strip() if email else ''
+        if not email or midterm is None or final_exam is None:
+            errors.append((row_idx, f"Incomplete data in row: {(email or None, midterm, final_exam)}"))
+            continue
+        if email in first_seen:
+            errors.append((row_idx, f"Duplicate row for email: {email} (first seen in row {first_seen[email]})"))
+            continue
+        first_seen[email] = row_idx
+        try:
+            parsed.append((
+                row_idx,
+                email,
+                parse_score(midterm, 'Midterm grade'),
+                parse_score(final_exam, 'Final exam grade'),
+                parse_absences(absences),
+            ))
+        except ValueError as e:
+            errors.append((row_idx, str(e)))
+
+    students = {
+        profile.user.email: profile
+        for profile in StudentProfile.objects.filter(user__email__in=first_seen).select_related('user')
+    }
+    existing = {
+        grade.student_id: grade
+        for grade in Grade.objects.filter(course=course, student__in=students.values())
+    }
+
+    to_create = []
+    to_update = []
+    unchanged = 0
+    for row_idx, email, midterm, final_exam, absences in parsed:
+        student = students.get(email)
+        if student is None:
+            errors.append((row_idx, f"StudentProfile not found for email: {email}"))
+            continue
+
+        grade = existing.get(student.id)
+        if grade is None:
+            grade = Grade(student=student, course=course)
+            to_create.append(grade)
+        elif (grade.midterm_grade, grade.final_exam_grade, grade.absences) == (midterm, final_exam, absences):
+            unchanged += 1
+            continue
+        else:
+            to_update.append(grade)
+        grade.midterm_grade = midterm
+        grade.final_exam_grade = final_exam
+        grade.absences = absences
+
+    apply_computed_grades(to_create + to_update)
+    return to_create, to_update, unchanged, format_row_errors(errors)
+
+
+def bulk_save_grades(course, rows):
+    """
+    Save a regular grade sheet for one course, all or nothing, with a fixed number of queries.
+    Every row is validated first (see validate_grade_rows). If any row is invalid nothing is
+    written; otherwise only new and changed grades are written, in one transaction.
+    Returns {'errors', 'inserted', 'updated', 'unchanged'}.
+    """
+    to_create, to_update, unchanged, errors = validate_grade_rows(course, rows)
+    if errors:
+        return {'errors': errors, 'inserted': 0, 'updated': 0, 'unchanged': 0}
+
+    if to_create or to_update:
+        with transaction.atomic():
+            Grade.objects.bulk_create(to_create, batch_size=500)
+            Grade.objects.bulk_update(to_update, SAVED_FIELDS, batch_size=500)
+            refresh_grade_summaries([grade.student_id for grade in to_create + to_update])
+
+    return {'errors': [], 'inserted': len(to_create), 'updated': len(to_update), 'unchanged': unchanged}
+
+
+def validate_resit_rows(course, rows):
+    """
+    Validate a resit grade sheet for one course without writing anything.
+    `rows` yields (row_number, email, resit_grade) tuples. Returns (grades, unchanged, errors):
+    the course's Grade rows whose resit_exam_grade changed (already set to the new value),
+    the number of rows matching the stored resit grade, and "Row N: ..." strings.
+    """
+    errors = []
+    parsed = []
+    first_seen = {}
+    for row_idx, email, resit_grade in rows:
+        email = str(email).strip() if email else ''
+        if not email or resit_grade is None:
+            errors.append((row_idx, f"Incomplete data in row: {(email or None, resit_grade)}"))
+            continue
+        if email in first_seen:
+            errors.append((row_idx, f"Duplicate row for email: {email} (first seen in row {first_seen[email]})"))
+            continue
+        first_seen[email] = row_idx
+        try:
+            parsed.append((row_idx, email, parse_score(resit_grade, 'Resit grade')))
+        except ValueError as e:
+            errors.append((row_idx, str(e)))
+
+    students = {
+        profile.user.email: profile
+        for profile in StudentProfile.objects.filter(user__email__in=first_seen).select_related('user')
+    }
+    existing = {
+        grade.student_id: grade
+        for grade in Grade.objects.filter(course=course, student__in=students.values())
+    }
+
+    grades = []
+    unchanged = 0
+    for row_idx, email, resit_grade in parsed:
+        student = students.get(email)
+        if student is None:
+            errors.append((row_idx, f"StudentProfile not found for email: {email}"))
+            continue
+        grade = existing.get(student.id)
+        if grade is None:
+            errors.append((row_idx, f"Grade record not found for {email} in course {course.name}"))
+            continue
+        if grade.resit_exam_grade == resit_grade:
+            unchanged += 1
+            continue
+        grade.resit_exam_grade = resit_grade
+        grades.append(grade)
+
+    return grades, unchanged, format_row_errors(errors)
+
+
+def bulk_save_resit_grades(course, rows):
+    """
+    Save a resit grade sheet for one course, all or nothing, with a fixed number of queries.
+    Rows are validated first (see validate_resit_rows); if any is invalid nothing is written.
+    The resit final and letter grades of the changed rows are computed in one pass and only
+    the resit fields are written, with a single bulk update.
+    Returns {'errors', 'inserted', 'updated', 'unchanged'} (resit sheets never insert).
+    """
+    grades, unchanged, errors = validate_resit_rows(course, rows)
+    if errors:
+        return {'errors': errors, 'inserted': 0, 'updated': 0, 'unchanged': 0}
+
+    computed = compute_grades(
+        [grade.midterm_grade for grade in grades],
+        [grade.final_exam_grade for grade in grades],
+        [grade.absences for grade in grades],
+        [grade.resit_exam_grade for grade in grades],
+    )
+    for i, grade in enumerate(grades):
+        grade.resit_final_grade = computed['resit_final_grade'][i]
+        grade.resit_letter_grade = computed['resit_letter_grade'][i]
+
+    if grades:
+        with transaction.atomic():
+            Grade.objects.bulk_update(grades, RESIT_FIELDS, batch_size=500)
+            refresh_grade_summaries([grade.student_id for grade in grades])
+
+    return {'errors': [], 'inserted': 0, 'updated': len(grades), 'unchanged': unchanged}
@@ -1,11 +1,17 @@
-from django.shortcuts import render, get_object_or_404, redirect
-from django.http import HttpResponse, JsonResponse, HttpResponseNotAllowed
-import openpyxl
-from django.core.paginator import Paginator
-from exams.utils import determine_eligibility, get_letter_grade, save_grade
-from .models import Grade, StudentProfile, Course
+import logging
+
+from django.shortcuts import render, redirect
+from django.http import FileResponse, HttpResponse, JsonResponse, HttpResponseNotAllowed, StreamingHttpResponse
+from se302_project.pagination import DEFAULT_COUNT_LIMIT, KeysetPaginator
+from jobs.views import job_accepted_response
+from jobs.worker import enqueue_import, wants_async
+from .catalog import get_catalog, get_course_or_404
+from .models import Grade, StudentProfile
+from .exports import XLSX_CONTENT_TYPE, iter_csv, iter_resit_roster, resit_roster_header, write_xlsx
+from .importers import import_grades
 from django.views.decorators.http import require_POST
 
+logger = logging.getLogger(__name__)
 
 def declare_resit(request):
     if request.method == 'POST':
@@ -19,7 +25,7 @@ def declare_resit(request):
         try:
             resit = Grade.objects.get(student=student, course__code=course_code)
             resit.declared_resit = True
-            resit.save()
+            resit.save(update_fields=['declared_resit'])
             return JsonResponse({'status': 'success'})
         except Grade.DoesNotExist:
             return JsonResponse({'status': 'error', 'message': 'No eligible resit found'}, status=404)
@@ -43,95 +49,63 @@ def delete_grade(request):
 
 @require_POST
 def upload_grades(request, course_id):
-    course = get_object_or_404(Course, id=course_id)
+    course = get_course_or_404(course_id)
     upload_type = request.POST.get('upload_type', 'regular')  # default to 'regular'
     excel_file = request.FILES.get('grade_file')
 
     if not excel_file:
         return JsonResponse({'status': 'error', 'message': 'No file uploaded'}, status=400)
 
-    try:
-        workbook = openpyxl.load_workbook(excel_file)
-        sheet = workbook.active  # Use the first sheet
-
-        if upload_type == "resit":
-            for row in sheet.iter_rows(min_row=2, values_only=True):
-                print(f"DEBUG: Row: {row}")
-                if len(row) != 2:
-                    raise ValueError(f"Invalid row format: {row}")
-
-                email, resit_grade = row
-
-                try:
-                    student = StudentProfile.objects.get(user__email=email)
-                except StudentProfile.DoesNotExist:
-                    raise ValueError(f"StudentProfile not found for email: {email}")
-
-                try:
-                    grade_obj = Grade.objects.get(student=student, course=course)
-                except Grade.DoesNotExist:
-                    raise ValueError(f"Grade record not found for {email} in course {course.name}")
+    if wants_async(request):
+        job = enqueue_import('grades', excel_file, {'course_id': course.id, 'upload_type': upload_type}, request.user)
+        return job_accepted_response(job)
 
-                grade_obj.resit_exam_grade = resit_grade
-                grade_obj.save()
-                print(f"CONFIRM: {email} => Saved resit grade: {grade_obj.resit_exam_grade}")
-
-        else:
-            # Regular upload: email, midterm, final, [optional absences]
-            for row in sheet.iter_rows(min_row=2, values_only=True):
-                print(f"DEBUG: Row: {row}")
-                if len(row) < 3:
-                    raise ValueError(f"Incomplete data in row: {row}")
-
-                email, midterm, final_exam, *optional_absences = row
-                absences = optional_absences[0] if optional_absences else 0
-
-                student = get_object_or_404(StudentProfile, user__email=email)
-                save_grade(student, course, midterm, final_exam, absences)
+    try:
+        result = import_grades(course, excel_file, upload_type)
+        errors = result.pop('errors')
+        if errors:
+            return JsonResponse({'status': 'error', 'message': '\n'.join(errors), 'errors': errors}, status=400)
 
-        return JsonResponse({'status': 'success'})
+        return JsonResponse({'status': 'success', **result})
 
     except Exception as e:
-        print(f"ERROR: {e}")
+        logger.exception("Grade upload failed for course %s", course.code)
         return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
 
     
 def download_resit_excel(request):
-    course_code = request.GET.get('course_code')
+    # One or more course codes: ?course_code=SE302&course_code=SE310 or ?course_code=SE302,SE310
+    course_codes = []
+    for value in request.GET.getlist('course_code'):
+        course_codes += [code.strip() for code in value.split(',') if code.strip()]
+    course_codes = list(dict.fromkeys(course_codes))
 
-    if not course_code:
+    if not course_codes:
         return HttpResponse("No course selected.", status=400)
 
-    # Filter students who declared resit for the selected course
-    students = Grade.objects.filter(
-        course__code=course_code,
-        declared_resit=True
-    ).select_related('student__user')
-
-    # Create an Excel workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = f"{course_code} Resits"
+    export_format = request.GET.get('format', 'xlsx')
+    header = resit_roster_header(course_codes)
+    rows = iter_resit_roster(course_codes)
+    basename = f"{course_codes[0]}_resit_students" if len(course_codes) == 1 else "resit_students"
 
-    # Write header
-    ws.append(['Student Email'])
+    if export_format == 'csv':
+        response = StreamingHttpResponse(iter_csv(header, rows), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{basename}.csv"'
+        return response
 
-    # Write emails
-    for student in students:
-        ws.append([student.student.user.email])
-
-    # Create response
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    filename = f"{course_code}_resit_students.xlsx"
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    wb.save(response)
-    return response
+    title = f"{course_codes[0]} Resits" if len(course_codes) == 1 else "Resits"
+    return FileResponse(
+        write_xlsx(header, rows, title),
+        as_attachment=True,
+        filename=f"{basename}.xlsx",
+        content_type=XLSX_CONTENT_TYPE,
+    )
 
 
 
 def insexam(request):
-    # Get all courses
-    courses = Course.objects.all()
+    # Course dropdowns come from the in-memory catalog; its version keys their cached fragments
+    courses = get_catalog()
 
     # Separate filters for both tables
     selected_course = request.GET.get('course')
@@ -140,8 +114,10 @@ def insexam(request):
     selected_eligibility2 = request.GET.get('eligibility2')
 
     # Base querysets with ordering to avoid UnorderedObjectListWarning
-    students = Grade.objects.all().order_by('id')  # You can change 'id' to another field like 'student__user__email'
-    resit_students = Grade.objects.filter(declared_resit=True).order_by('id')
+    # The tables show the student's email and the course code, so join them in up front.
+    grade_rows = Grade.objects.select_related('student__user', 'course')
+    students = grade_rows.order_by('id')  # You can change 'id' to another field like 'student__user__email'
+    resit_students = grade_rows.filter(declared_resit=True).order_by('id')
 
     # Apply filters
     if selected_course:
@@ -156,27 +132,27 @@ def insexam(request):
     if selected_eligibility2:
         resit_students = resit_students.filter(eligibility=selected_eligibility2)
 
-    # Pagination for filtered students
-    page_number = request.GET.get('page', 1)
-    paginator = Paginator(students, 5)
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination for filtered students
+    paginator = KeysetPaginator(students, 5, count_limit=DEFAULT_COUNT_LIMIT)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
 
-    # Pagination for filtered resit students
-    page_number2 = request.GET.get('page2', 1)
-    paginator2 = Paginator(resit_students, 5)
-    page_obj2 = paginator2.get_page(page_number2)
+    # Keyset pagination for filtered resit students
+    paginator2 = KeysetPaginator(resit_students, 5, count_limit=DEFAULT_COUNT_LIMIT)
+    page_obj2 = paginator2.get_page(request.GET.get('cursor2'))
 
+    # The dropdown fragments are cached per selected course, so only known codes
+    # reach the cache key; anything else leaves "All Courses" selected.
     context = {
         'students': page_obj.object_list,
         'page_obj': page_obj,
         'paginator': paginator,
-        'selected_course': selected_course,
+        'selected_course': selected_course if selected_course in courses.by_code else '',
         'selected_eligibility': selected_eligibility,
 
         'students2': page_obj2.object_list,
         'page_obj2': page_obj2,
         'paginator2': paginator2,
-        'selected_course2': selected_course2,
+        'selected_course2': selected_course2 if selected_course2 in courses.by_code else '',
         'selected_eligibility2': selected_eligibility2,
 
         'courses': courses,
@@ -190,64 +166,24 @@ def resitgrades(request):
 
 
 def studentgrade(request):
-    if not hasattr(request.user, 'studentprofile'):
+    # Derived fields and the GPA summary are maintained on write (upload, resit
+    # entry), so this is a pure read: the profile with its summary, then the grades.
+    student = StudentProfile.objects.select_related('grade_summary').filter(user=request.user).first()
+    if student is None:
         return redirect('some_error_page')
 
-    student = request.user.studentprofile
-    grades = Grade.objects.filter(student=student)
-
-    total_points = 0
-    total_courses = 0
-
-    letter_to_gpa = {
-        'AA': 4.0, 'BA': 3.5, 'BB': 3.0,
-        'CB': 2.5, 'CC': 2.0, 'DC': 1.5,
-        'DD': 1.0, 'FD': 0.5, 'FF': 0.0, 'DZ': 0.0,
-    }
+    grades = Grade.objects.filter(student=student).select_related('course').order_by('id')
 
     original_grades = []
     resit_grades = []
 
     for grade in grades:
-        # Original calculation
-        if grade.absences > 3:
-            original_letter = "DZ"
-            original_final = (grade.midterm_grade * 0.4) + (grade.final_exam_grade * 0.6)
-        else:
-            original_final = (grade.midterm_grade * 0.4) + (grade.final_exam_grade * 0.6)
-            original_letter = get_letter_grade(original_final)
-
-        grade.final_grade = original_final
-        grade.letter_grade = original_letter
-
-        # Resit calculation
         if grade.resit_exam_grade is not None:
-            resit_final = (grade.midterm_grade * 0.4) + (grade.resit_exam_grade * 0.6)
-
-            if grade.absences > 3:
-                resit_letter = "DZ"
-            else:
-                resit_letter = get_letter_grade(resit_final)
-
-            grade.resit_final_grade = resit_final
-            grade.resit_letter_grade = resit_letter
-
-            # ✅ Use resit grade for GPA
-            gpa_point = letter_to_gpa.get(resit_letter, 0.0)
             resit_grades.append(grade)
-        else:
-            grade.resit_final_grade = None
-            grade.resit_letter_grade = None
-
-            # ✅ Use original grade for GPA
-            gpa_point = letter_to_gpa.get(original_letter, 0.0)
-
-        grade.save()
-        total_points += gpa_point
-        total_courses += 1
         original_grades.append(grade)
 
-    gpa = round(total_points / total_courses, 2) if total_courses > 0 else None
+    summary = getattr(student, 'grade_summary', None)
+    gpa = summary.gpa if summary else None
 
     return render(request, 'studentgrade.html', {
         'original_grades': original_grades,
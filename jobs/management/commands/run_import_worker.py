@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from jobs.worker import run_worker
+
+
+class Command(BaseCommand):
+    help = "Run queued spreadsheet import jobs in this process."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit when the queue is empty.")
+
+    def handle(self, *args, **options):
+        run_worker(once=options['once'])
@@ -0,0 +1,157 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+
+import openpyxl
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.urls import reverse
+
+from exams.models import Course, Grade
+from users.models import StudentProfile
+from .models import ImportJob
+from .worker import claim_job, enqueue_import, fail_stale_jobs, process_job, run_worker, serves_requests
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_xlsx(rows, name="grades.xlsx"):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    content = BytesIO()
+    workbook.save(content)
+    return SimpleUploadedFile(name, content.getvalue())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMPORT_JOBS={'EAGER': True})
+class ImportJobTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='student', email='student@example.com')
+        self.student = StudentProfile.objects.create(user=self.user)
+        self.course = Course.objects.create(code="TC101", name="Test Course")
+
+    def test_async_upload_returns_job(self):
+        """Test an async upload is queued, run and reported by the status endpoint"""
+        self.client.force_login(User.objects.create_user(username='instructor'))
+        upload = make_xlsx([['email', 'midterm', 'final_exam'], ['student@example.com', 80, 85], ['nobody@example.com', 50, 50]])
+        response = self.client.post(
+            reverse('upload_grades', args=[self.course.id]),
+            {'grade_file': upload, 'upload_type': 'regular', 'async': '1'},
+        )
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['job_id']
+
+        status = self.client.get(reverse('import_job_status', args=[job_id])).json()
+        self.assertEqual(status['status'], ImportJob.COMPLETED)
+        self.assertEqual(status['processed_rows'], 2)
+        self.assertEqual(len(status['errors']), 1)
+        # Imports are all or nothing: the valid row is not saved either.
+        self.assertFalse(Grade.objects.filter(student=self.student).exists())
+
+    def test_failed_job_records_message(self):
+        """Test an importer exception marks the job as failed"""
+        upload = SimpleUploadedFile('grades.xlsx', b'not a workbook')
+        job = enqueue_import('grades', upload, {'course_id': self.course.id, 'upload_type': 'resit'})
+        self.assertEqual(job.status, ImportJob.FAILED)
+        self.assertIn('Could not read the uploaded file', job.message)
+        self.assertIsNotNone(job.finished_at)
+
+    @override_settings(IMPORT_JOBS={'EAGER': False, 'AUTOSTART': False})
+    def test_worker_claims_each_job_once(self):
+        """Test queued jobs are claimed by exactly one worker and run"""
+        upload = make_xlsx([['email', 'midterm', 'final_exam'], ['student@example.com', 95, 95]])
+        job = enqueue_import('grades', upload, {'course_id': self.course.id})
+        self.assertEqual(job.status, ImportJob.QUEUED)
+
+        run_worker(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.COMPLETED)
+        self.assertIsNone(claim_job(job.id))
+        self.assertEqual(Grade.objects.get(student=self.student).letter_grade, "AA")
+
+    def test_status_hidden_from_other_users(self):
+        """Test a job's status is only visible to the user who queued it"""
+        owner = User.objects.create_user(username='owner', password='ownerpass123')
+        job = enqueue_import('students', make_xlsx([['email', 'name', 'program']]), user=owner)
+        response = self.client.get(reverse('import_job_status', args=[job.id]))
+        self.assertEqual(response.status_code, 404)
+        self.client.login(username='owner', password='ownerpass123')
+        response = self.client.get(reverse('import_job_status', args=[job.id]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_status_of_ownerless_job_is_staff_only(self):
+        """Test jobs without an owner are hidden from anonymous and regular users"""
+        job = enqueue_import('students', make_xlsx([['email', 'name', 'program']]))
+        url = reverse('import_job_status', args=[job.id])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.force_login(User.objects.create_user(username='admin', is_staff=True))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_anonymous_async_upload_runs_inline(self):
+        """Test an anonymous upload asking for async is not queued as a job"""
+        upload = make_xlsx([['email', 'midterm', 'final_exam'], ['student@example.com', 80, 85]])
+        response = self.client.post(
+            reverse('upload_grades', args=[self.course.id]),
+            {'grade_file': upload, 'upload_type': 'regular', 'async': '1'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ImportJob.objects.exists())
+
+    @override_settings(IMPORT_JOBS={'EAGER': False, 'AUTOSTART': False, 'LEASE': 600})
+    def test_worker_start_fails_stale_running_jobs(self):
+        """Test running jobs left behind by a dead worker are failed and fresh ones kept"""
+        stale = enqueue_import('grades', make_xlsx([['email']]), {'course_id': self.course.id})
+        fresh = enqueue_import('grades', make_xlsx([['email']]), {'course_id': self.course.id})
+        ImportJob.objects.filter(id=stale.id).update(
+            status=ImportJob.RUNNING, started_at=timezone.now() - timedelta(seconds=601)
+        )
+        ImportJob.objects.filter(id=fresh.id).update(status=ImportJob.RUNNING, started_at=timezone.now())
+
+        run_worker(once=True)
+
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual(stale.status, ImportJob.FAILED)
+        self.assertIn('interrupted', stale.message)
+        self.assertIsNotNone(stale.finished_at)
+        self.assertFalse(stale.file.storage.exists(stale.file.name))
+        self.assertEqual(fresh.status, ImportJob.RUNNING)
+        self.assertEqual(fail_stale_jobs(), 0)
+
+    @override_settings(IMPORT_JOBS={'EAGER': False, 'AUTOSTART': False, 'LEASE': 600})
+    def test_job_failed_for_outliving_its_lease_stays_failed(self):
+        """Test a worker finishing a job that was already failed as stale does not overwrite it"""
+        upload = make_xlsx([['email', 'midterm', 'final_exam'], ['student@example.com', 95, 95]])
+        job = claim_job(enqueue_import('grades', upload, {'course_id': self.course.id}).id)
+        ImportJob.objects.filter(id=job.id).update(started_at=timezone.now() - timedelta(seconds=601))
+        self.assertEqual(fail_stale_jobs(), 1)
+
+        job = process_job(job)
+        self.assertEqual(job.status, ImportJob.FAILED)
+        self.assertIn('interrupted', ImportJob.objects.get(id=job.id).message)
+
+    def test_workers_autostart_only_in_serving_processes(self):
+        """Test management commands other than runserver's serving process do not start worker threads"""
+        self.assertTrue(serves_requests(['gunicorn', 'se302_project.wsgi']))
+        self.assertTrue(serves_requests(['manage.py', 'runserver', '--noreload']))
+        with mock.patch.dict(os.environ, {'RUN_MAIN': 'true'}):
+            self.assertTrue(serves_requests(['manage.py', 'runserver']))
+        with mock.patch.dict(os.environ):
+            os.environ.pop('RUN_MAIN', None)
+            self.assertFalse(serves_requests(['manage.py', 'runserver']))
+        self.assertFalse(serves_requests(['manage.py', 'migrate']))
+        self.assertFalse(serves_requests(['manage.py', 'run_import_worker']))
@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('<int:job_id>/', views.import_job_status, name='import_job_status'),
+]
@@ -0,0 +1,35 @@
+from django.http import JsonResponse
+from django.urls import reverse
+
+from .models import ImportJob
+
+
+def job_accepted_response(job):
+    return JsonResponse({
+        'status': 'queued',
+        'job_id': job.id,
+        'status_url': reverse('import_job_status', args=[job.id]),
+    }, status=202)
+
+
+def import_job_status(request, job_id):
+    job = ImportJob.objects.filter(id=job_id).first()
+    # Only the uploader (or staff) may see a job; jobs without an owner are staff-only.
+    is_owner = job is not None and job.created_by_id is not None and job.created_by_id == request.user.id
+    if job is None or not (is_owner or request.user.is_staff):
+        return JsonResponse({'status': 'error', 'message': 'Job not found'}, status=404)
+
+    return JsonResponse({
+        'job_id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'file_name': job.file_name,
+        'processed_rows': job.processed_rows,
+        'rows_per_second': job.rows_per_second,
+        'errors': job.errors,
+        'result': job.result,
+        'message': job.message,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+    })
@@ -0,0 +1,231 @@
+"""
+A small DB-backed import queue.
+
+Upload views call enqueue_import(); the job row (with the uploaded file saved to
+storage) is the queue entry. A pool of daemon threads in the web process claims
+queued jobs with a conditional UPDATE and runs the importer registered for the
+job's kind; the threads start when the web process boots (AUTOSTART) and are
+woken by each new job. The run_import_worker management command runs the same
+loop in a separate process for deployments that turn AUTOSTART off.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from se302_project.conf import app_setting
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+# Importer entry points: callable(uploaded_file, params, progress) -> result dict.
+IMPORTERS = {
+    'grades': 'exams.importers.run_import_job',
+    'students': 'users.importers.run_import_job',
+    'resit_schedule': 'declarations.importers.run_schedule_import_job',
+    'resit_details': 'declarations.importers.run_details_import_job',
+    'resit_details_bulk': 'declarations.importers.run_bulk_details_import_job',
+}
+
+_wakeup = threading.Event()
+_threads = []
+_threads_lock = threading.Lock()
+
+
+def wants_async(request):
+    # Job results name students, so only signed-in users (who can read them back) get jobs.
+    return request.user.is_authenticated and str(request.POST.get('async', '')).lower() in ('1', 'true', 'yes')
+
+
+def enqueue_import(kind, uploaded_file, params=None, user=None):
+    """Queue an import of uploaded_file and return the ImportJob."""
+    if kind not in IMPORTERS:
+        raise ValueError(f"Unknown import kind: {kind}")
+
+    job = ImportJob(
+        kind=kind,
+        params=params or {},
+        file_name=uploaded_file.name,
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+    job.file.save(uploaded_file.name, uploaded_file, save=False)
+    job.save()
+
+    if app_setting('IMPORT_JOBS', 'EAGER'):
+        claimed = claim_job(job.id)
+        if claimed:
+            process_job(claimed)
+            job.refresh_from_db()
+    else:
+        transaction.on_commit(wake_workers)
+    return job
+
+
+def claim_job(job_id):
+    """Atomically move a queued job to running; returns the job or None if another worker got it."""
+    claimed = ImportJob.objects.filter(id=job_id, status=ImportJob.QUEUED).update(
+        status=ImportJob.RUNNING, started_at=timezone.now()
+    )
+    return ImportJob.objects.get(id=job_id) if claimed else None
+
+
+def claim_next_job():
+    queued = ImportJob.objects.filter(status=ImportJob.QUEUED).order_by('created_at', 'id')
+    for job_id in queued.values_list('id', flat=True)[:10]:
+        job = claim_job(job_id)
+        if job:
+            return job
+    return None
+
+
+class ProgressReporter:
+    """Callable handed to importers; writes the processed row count at most once per interval."""
+
+    def __init__(self, job, interval):
+        self.job = job
+        self.interval = interval
+        self.count = 0
+        self._last_write = 0.0
+
+    def __call__(self, count):
+        self.count = count
+        now = time.monotonic()
+        if now - self._last_write >= self.interval:
+            self._last_write = now
+            ImportJob.objects.filter(id=self.job.id).update(processed_rows=count)
+
+
+def process_job(job):
+    """Run a claimed job to completion and record its outcome."""
+    progress = ProgressReporter(job, app_setting('IMPORT_JOBS', 'PROGRESS_INTERVAL'))
+    try:
+        importer = import_string(IMPORTERS[job.kind])
+        with job.file.open('rb') as stored_file:
+            result = importer(File(stored_file.file, name=job.file_name), job.params, progress)
+    except Exception as e:
+        logger.exception("Import job %s (%s) failed", job.pk, job.kind)
+        job.status = ImportJob.FAILED
+        job.message = str(e)
+        job.result = {}
+    else:
+        job.status = ImportJob.COMPLETED
+        job.errors = result.pop('errors', [])
+        job.result = result
+    job.processed_rows = progress.count
+    job.finished_at = timezone.now()
+
+    # Only a job that is still running is finished here: one that outlived its
+    # lease has been failed (and its file deleted) by fail_stale_jobs.
+    updated = ImportJob.objects.filter(id=job.id, status=ImportJob.RUNNING).update(
+        status=job.status,
+        message=job.message,
+        errors=job.errors,
+        result=job.result,
+        processed_rows=job.processed_rows,
+        finished_at=job.finished_at,
+    )
+    if updated:
+        job.file.delete(save=False)
+    else:
+        logger.warning("Import job %s (%s) finished after it was marked failed; result discarded", job.pk, job.kind)
+        job.refresh_from_db()
+    return job
+
+
+def fail_stale_jobs():
+    """
+    Mark running jobs started more than LEASE seconds ago as failed. Workers
+    die with their process (restart, deploy), leaving their job running with
+    nobody to finish it; the upload has to be repeated.
+    """
+    cutoff = timezone.now() - timedelta(seconds=app_setting('IMPORT_JOBS', 'LEASE'))
+    failed = 0
+    for job in ImportJob.objects.filter(status=ImportJob.RUNNING, started_at__lt=cutoff):
+        updated = ImportJob.objects.filter(id=job.id, status=ImportJob.RUNNING).update(
+            status=ImportJob.FAILED,
+            message='The import was interrupted before it finished. Please upload the file again.',
+            finished_at=timezone.now(),
+        )
+        if updated:
+            logger.warning("Import job %s (%s) was still running after the lease; marked failed", job.pk, job.kind)
+            job.file.delete(save=False)
+            failed += 1
+    return failed
+
+
+def run_worker(stop_event=None, once=False):
+    """Claim and run queued jobs until stop_event is set (or the queue is empty, with once=True)."""
+    poll_interval = app_setting('IMPORT_JOBS', 'POLL_INTERVAL')
+    fail_stale_jobs()
+    while stop_event is None or not stop_event.is_set():
+        close_old_connections()
+        job = claim_next_job()
+        if job is None:
+            if once:
+                return
+            _wakeup.wait(poll_interval)
+            _wakeup.clear()
+            continue
+        process_job(job)
+
+
+def _run_worker_thread():
+    # Threads started from AppConfig.ready() wait for the app registry to finish loading.
+    apps.ready_event.wait()
+    while True:
+        try:
+            run_worker()
+        except Exception:
+            # e.g. the database is not migrated yet; keep the thread for when it is.
+            logger.exception("Import worker stopped; restarting")
+            time.sleep(app_setting('IMPORT_JOBS', 'POLL_INTERVAL'))
+
+
+def start_workers():
+    """Start the in-process worker threads once per process."""
+    with _threads_lock:
+        if _threads:
+            return
+        for i in range(app_setting('IMPORT_JOBS', 'WORKERS')):
+            thread = threading.Thread(target=_run_worker_thread, name=f'import-worker-{i}', daemon=True)
+            thread.start()
+            _threads.append(thread)
+
+
+def wake_workers():
+    if app_setting('IMPORT_JOBS', 'AUTOSTART'):
+        start_workers()
+    _wakeup.set()
+
+
+def serves_requests(argv=None):
+    """
+    Whether this process serves the site: a WSGI/ASGI server, or the serving
+    process of runserver. Other management commands (migrate, test,
+    run_import_worker, ...) and runserver's autoreload watcher do not.
+    """
+    argv = sys.argv if argv is None else argv
+    program = os.path.basename(argv[0]) if argv else ''
+    if program not in ('manage.py', 'django-admin', '__main__.py'):
+        return True
+    if len(argv) < 2 or argv[1] != 'runserver':
+        return False
+    return os.environ.get('RUN_MAIN') == 'true' or '--noreload' in argv
+
+
+def autostart_workers():
+    """
+    Called from JobsConfig.ready(): with AUTOSTART on, start the worker threads
+    as soon as a serving process boots, so jobs queued before a restart run
+    and stale running jobs are failed without waiting for the next upload.
+    """
+    if app_setting('IMPORT_JOBS', 'AUTOSTART') and serves_requests():
+        start_workers()
@@ -0,0 +1,51 @@
+"""
+Defaults of the project's grouped settings.
+
+Each group is a dict in settings.py (IMPORT_JOBS, COURSE_CATALOG, ...) that
+only needs the keys it changes; app_setting() falls back to the values here.
+"""
+from django.conf import settings
+
+DEFAULTS = {
+    # Announcement feeds (courses/feeds.py)
+    'ANNOUNCEMENT_FEED': {
+        'PAGE_SIZE': 50,       # announcements on the full list pages
+        'DASHBOARD_SIZE': 5,   # announcements on the dashboards
+        'TIMEOUT': 300,        # seconds; bounds staleness from changes signals can't see (group moves)
+    },
+    # Process-local course catalog (exams/catalog.py)
+    'COURSE_CATALOG': {
+        'TIMEOUT': 300,   # seconds; reload even without a new version (bounds staleness with a per-process cache backend)
+    },
+    # Cached resit announcement pages (declarations/announcements.py)
+    'RESIT_ANNOUNCEMENTS': {
+        'TIMEOUT': 600,   # seconds; bounds staleness from writes that skip invalidation (queryset.update())
+    },
+    # {% cache %} fragments (se302_project/context_processors.py)
+    'FRAGMENT_CACHE': {
+        'TIMEOUT': 0,      # seconds; 0 renders the fragments every time
+        'VERSION': '1',    # part of every fragment key; bump to drop fragments after a deploy
+    },
+    # Per-request instrumentation (se302_project/instrumentation.py)
+    'REQUEST_METRICS': {
+        'ENABLED': False,
+        'LOG': False,                # one structured log record per request
+        'SAMPLE_SIZE': 500,          # most recent requests kept per view
+        'DUPLICATE_THRESHOLD': 3,    # same statement this many times in one request => likely N+1
+        'SERVER_TIMING': True,       # add a Server-Timing header (app and db durations)
+    },
+    # Background spreadsheet imports (jobs/worker.py)
+    'IMPORT_JOBS': {
+        'WORKERS': 2,             # in-process worker threads
+        'AUTOSTART': True,        # start the threads when a serving process boots; with False, run `manage.py run_import_worker`
+        'EAGER': False,           # run jobs inline when queued (tests)
+        'POLL_INTERVAL': 5.0,
+        'PROGRESS_INTERVAL': 1.0,
+        'LEASE': 1800,            # seconds; running jobs older than this are failed when a worker starts
+    },
+}
+
+
+def app_setting(group, name):
+    """settings.<group>[name], or its default from DEFAULTS."""
+    return getattr(settings, group, {}).get(name, DEFAULTS[group][name])
@@ -0,0 +1,14 @@
+"""
+Template context shared by every page.
+
+fragment_cache exposes the {% cache %} timeout and version used by the role
+sidebars and course dropdowns, so templates don't hard-code them.
+"""
+from .conf import app_setting
+
+
+def fragment_cache(request):
+    return {
+        'fragment_cache_timeout': app_setting('FRAGMENT_CACHE', 'TIMEOUT'),
+        'fragment_cache_version': app_setting('FRAGMENT_CACHE', 'VERSION'),
+    }
@@ -0,0 +1,167 @@
+"""
+Per-request latency and query instrumentation.
+
+RequestMetricsMiddleware times every request, counts its queries and their
+database time through a connection execute wrapper, and flags SQL statements
+that repeat within one request as likely N+1 patterns. Samples are kept per
+view in a bounded, process-local registry (each worker process has its own)
+and summarized as percentiles by the staff-only request_metrics view.
+
+Disabled by default: with REQUEST_METRICS['ENABLED'] off the middleware raises
+MiddlewareNotUsed and is dropped from the chain, so it costs nothing.
+"""
+import json
+import logging
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import JsonResponse
+
+from .conf import app_setting
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class QueryCollector:
+    """Execute wrapper counting queries, their time and repeated statements."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    def duplicates(self, threshold):
+        return {sql: count for sql, count in self.statements.items() if count >= threshold}
+
+
+class MetricsRegistry:
+    """Thread-safe store of recent request samples per view."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._samples = defaultdict(lambda: deque(maxlen=app_setting('REQUEST_METRICS', 'SAMPLE_SIZE')))
+            self._totals = defaultdict(lambda: {'requests': 0, 'n_plus_one': 0})
+
+    def record(self, view, wall_ms, queries, db_ms, flagged):
+        with self._lock:
+            self._samples[view].append((wall_ms, queries, db_ms))
+            totals = self._totals[view]
+            totals['requests'] += 1
+            totals['n_plus_one'] += bool(flagged)
+
+    def snapshot(self):
+        """Per-view request totals and p50/p95/p99 of wall time, query count and DB time."""
+        with self._lock:
+            samples = {view: list(values) for view, values in self._samples.items()}
+            totals = {view: dict(values) for view, values in self._totals.items()}
+
+        summary = {}
+        for view, values in sorted(samples.items()):
+            columns = dict(zip(('wall_ms', 'queries', 'db_ms'), (sorted(column) for column in zip(*values))))
+            summary[view] = dict(totals[view], samples=len(values))
+            for name, column in columns.items():
+                summary[view][name] = {
+                    'p50': percentile(column, 0.50),
+                    'p95': percentile(column, 0.95),
+                    'p99': percentile(column, 0.99),
+                    'max': column[-1],
+                }
+        return summary
+
+
+registry = MetricsRegistry()
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+class RequestMetricsMiddleware:
+    """Record wall time, query count and DB time for each request.
+
+    Streaming responses are measured up to the point the response is returned;
+    queries run while the body is streamed are not counted.
+    """
+
+    def __init__(self, get_response):
+        if not app_setting('REQUEST_METRICS', 'ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        collector = QueryCollector()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(collector))
+            response = self.get_response(request)
+        wall_ms = (time.perf_counter() - start) * 1000
+        db_ms = collector.duration * 1000
+
+        view = view_name(request)
+        duplicates = collector.duplicates(app_setting('REQUEST_METRICS', 'DUPLICATE_THRESHOLD'))
+        registry.record(view, round(wall_ms, 2), collector.count, round(db_ms, 2), duplicates)
+
+        if app_setting('REQUEST_METRICS', 'SERVER_TIMING'):
+            response['Server-Timing'] = f'app;dur={wall_ms:.1f}, db;dur={db_ms:.1f}'
+
+        if duplicates:
+            logger.warning(
+                "Possible N+1 in %s: %s",
+                view,
+                "; ".join(f"{count}x {sql[:200]}" for sql, count in duplicates.items()),
+            )
+        if app_setting('REQUEST_METRICS', 'LOG'):
+            logger.info(json.dumps({
+                'event': 'request',
+                'view': view,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'wall_ms': round(wall_ms, 2),
+                'queries': collector.count,
+                'db_ms': round(db_ms, 2),
+                'duplicate_queries': sum(duplicates.values()),
+            }))
+        return response
+
+
+@staff_member_required
+def request_metrics(request):
+    """Aggregated per-view metrics for this process. POST with reset=1 clears them."""
+    if request.method == 'POST' and request.POST.get('reset') in ('1', 'true'):
+        registry.reset()
+    return JsonResponse({
+        'status': 'success',
+        'enabled': app_setting('REQUEST_METRICS', 'ENABLED'),
+        'views': registry.snapshot(),
+    })
@@ -0,0 +1,114 @@
+"""
+Keyset (cursor) pagination for large listings.
+
+Unlike Django's Paginator, pages are fetched with `WHERE key > last_seen`
+instead of OFFSET and no full COUNT(*) is needed, so deep pages cost the same
+as the first one. Cursors are opaque, URL-safe strings.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+
+# Listings report their exact total up to this many rows and "N+" beyond it.
+DEFAULT_COUNT_LIMIT = 1000
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor, count=None, count_is_exact=True):
+        self.object_list = object_list
+        self.has_next_page = has_next
+        self.has_previous_page = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+        self.count_is_exact = count_is_exact
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.has_next_page
+
+    def has_previous(self):
+        return self.has_previous_page
+
+    def has_other_pages(self):
+        return self.has_next_page or self.has_previous_page
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset on a unique, orderable field (the primary key by default).
+    With count_limit set, pages also carry an approximate total: the exact count
+    up to count_limit rows, or count_limit with count_is_exact=False beyond it.
+    """
+
+    def __init__(self, queryset, per_page, key='id', count_limit=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.key = key
+        self.count_limit = count_limit
+
+    def get_page(self, cursor=None):
+        direction, value = decode_cursor(cursor)
+        if value is not None:
+            try:
+                value = self.queryset.model._meta.get_field(self.key).to_python(value)
+            except ValidationError:
+                # Well-formed cursor, but not a value of the key field: first page.
+                direction, value = 'next', None
+
+        if direction == 'prev':
+            rows = list(self.queryset.filter(**{f'{self.key}__lt': value}).order_by(f'-{self.key}')[:self.per_page + 1])
+            has_previous = len(rows) > self.per_page
+            object_list = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            queryset = self.queryset.order_by(self.key)
+            if value is not None:
+                queryset = queryset.filter(**{f'{self.key}__gt': value})
+            rows = list(queryset[:self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            object_list = rows[:self.per_page]
+            has_previous = value is not None
+
+        next_cursor = previous_cursor = None
+        if object_list:
+            if has_next:
+                next_cursor = encode_cursor('next', getattr(object_list[-1], self.key))
+            if has_previous:
+                previous_cursor = encode_cursor('prev', getattr(object_list[0], self.key))
+
+        count = None
+        count_is_exact = True
+        if self.count_limit is not None:
+            count = self.queryset.order_by()[:self.count_limit + 1].count()
+            if count > self.count_limit:
+                count, count_is_exact = self.count_limit, False
+
+        return KeysetPage(object_list, has_next, has_previous, next_cursor, previous_cursor, count, count_is_exact)
+
+
+def encode_cursor(direction, value):
+    payload = json.dumps({'d': direction, 'v': value}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (direction, value); an empty or malformed cursor means the first page."""
+    if not cursor:
+        return 'next', None
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(payload)
+        direction = data['d']
+        value = data['v']
+    except (ValueError, TypeError, KeyError):
+        return 'next', None
+    if direction not in ('next', 'prev') or value is None:
+        return 'next', None
+    return direction, value
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -20,12 +21,17 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-szzf=sn7-k4skci2bkbquq2#)$p7r3-v45kk_bq65ix(#&1uo^'
+SECRET_KEY = os.environ.get(
+    'DJANGO_SECRET_KEY', 'django-insecure-szzf=sn7-k4skci2bkbquq2#)$p7r3-v45kk_bq65ix(#&1uo^'
+)
+
+def env_flag(name, default):
+    return os.environ.get(name, default).lower() in ('1', 'true', 'yes', 'on')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = env_flag('DJANGO_DEBUG', '1')
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host.strip() for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host.strip()]
 
 
 # Application definition
@@ -41,10 +47,11 @@ INSTALLED_APPS = [
     'courses',
     'declarations',
     'exams',
-    
+    'jobs',
 ]
 
 MIDDLEWARE = [
+    'se302_project.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,34 +63,132 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'se302_project.urls'
 
+# Rendering profile. Parsed templates are kept in memory by the cached loader
+# (runserver's autoreloader still picks up template edits); DJANGO_TEMPLATE_CACHE=0
+# turns it off. Role sidebars and course dropdowns are cached as {% cache %}
+# fragments for FRAGMENT_CACHE['TIMEOUT'] seconds, 0 (off) by default when DEBUG
+# is on. Bump DJANGO_FRAGMENT_CACHE_VERSION on deploys that change those templates.
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if env_flag('DJANGO_TEMPLATE_CACHE', '1'):
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'se302_project.context_processors.fragment_cache',
             ],
         },
     },
 ]
 
+FRAGMENT_CACHE = {
+    'TIMEOUT': int(os.environ.get('DJANGO_FRAGMENT_CACHE_TIMEOUT', '0' if DEBUG else '3600')),
+    'VERSION': os.environ.get('DJANGO_FRAGMENT_CACHE_VERSION', '1'),
+}
+
 WSGI_APPLICATION = 'se302_project.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# SQLite is the default. Set DJANGO_DB_ENGINE=postgresql (and the DJANGO_DB_*
+# variables below) for deployments with concurrent writers; that needs the
+# psycopg package (psycopg[pool] for DJANGO_DB_POOL=1).
+
+DB_ENGINE = os.environ.get('DJANGO_DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DJANGO_DB_NAME', 'se302'),
+            'USER': os.environ.get('DJANGO_DB_USER', ''),
+            'PASSWORD': os.environ.get('DJANGO_DB_PASSWORD', ''),
+            'HOST': os.environ.get('DJANGO_DB_HOST', ''),
+            'PORT': os.environ.get('DJANGO_DB_PORT', ''),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if env_flag('DJANGO_DB_POOL', '0'):
+        # psycopg connection pool; Django requires CONN_MAX_AGE = 0 with pooling.
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DJANGO_DB_POOL_MIN', 2)),
+            'max_size': int(os.environ.get('DJANGO_DB_POOL_MAX', 10)),
+        }
+    else:
+        # Persistent connections, reused across requests for this many seconds.
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DJANGO_DB_CONN_MAX_AGE', 60))
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DJANGO_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # Seconds a connection waits on a locked database before "database is locked".
+                'timeout': int(os.environ.get('DJANGO_SQLITE_TIMEOUT', 20)),
+                # Take the write lock when a transaction starts, so writers queue on the
+                # busy timeout instead of failing on lock upgrade.
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+    if env_flag('DJANGO_SQLITE_WAL', '1'):
+        # WAL lets readers run alongside the single writer.
+        DATABASES['default']['OPTIONS']['init_command'] = (
+            'PRAGMA journal_mode=WAL;'
+            'PRAGMA synchronous=NORMAL;'
+            'PRAGMA temp_store=MEMORY;'
+            'PRAGMA cache_size=-20000;'
+            'PRAGMA mmap_size=134217728;'
+        )
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# DJANGO_CACHE_BACKEND is 'locmem', 'file', or a full backend path such as
+# django.core.cache.backends.redis.RedisCache. The announcement feeds, resit
+# announcements and course catalog are invalidated through this cache, so every
+# server process must share it: the default is 'file' (BASE_DIR/cache) unless
+# DEBUG is on, where the single runserver process can use 'locmem'. With a
+# per-process backend, other processes serve stale data until the TIMEOUT of
+# each of those caches.
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+CACHE_BACKEND = os.environ.get('DJANGO_CACHE_BACKEND', 'locmem' if DEBUG else 'file')
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': CACHE_BACKENDS.get(CACHE_BACKEND, CACHE_BACKEND),
+        'LOCATION': os.environ.get(
+            'DJANGO_CACHE_LOCATION',
+            str(BASE_DIR / 'cache') if CACHE_BACKEND == 'file' else 'se302',
+        ),
     }
 }
 
+# Grouped app settings: ANNOUNCEMENT_FEED (courses/feeds.py), COURSE_CATALOG
+# (exams/catalog.py), RESIT_ANNOUNCEMENTS (declarations/announcements.py),
+# FRAGMENT_CACHE, REQUEST_METRICS and IMPORT_JOBS (jobs/worker.py). Their
+# defaults live in se302_project/conf.py; define a group here with only the
+# keys to change, e.g. IMPORT_JOBS = {'WORKERS': 4}.
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -103,6 +208,14 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# How long a user's group names stay cached in their session (users/roles.py)
+ROLE_CACHE_SECONDS = 300
+
+# Processes used to hash passwords when student accounts are created in bulk
+# (defaults to the number of CPUs). Batches of fewer than 8 passwords per
+# process are hashed in the request's own process.
+# PASSWORD_HASH_WORKERS = 4
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -125,6 +238,59 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# Uploaded files (queued spreadsheet imports)
+
+MEDIA_ROOT = BASE_DIR / 'media'
+
+
+# Logging (see se302_project/logutils.py). Each app logs to its own named logger
+# through a non-blocking queue handler. DJANGO_LOG_LEVEL sets the level for all
+# apps, DJANGO_LOG_LEVEL_<APP> (e.g. DJANGO_LOG_LEVEL_EXAMS=DEBUG) overrides one.
+# DJANGO_LOG_FORMAT=json writes one JSON object per record.
+
+LOG_LEVEL = os.environ.get('DJANGO_LOG_LEVEL', 'INFO')
+LOG_APPS = ['exams', 'users', 'courses', 'declarations', 'jobs', 'se302_project']
+
+# Importers log every Nth row at DEBUG (0 disables per-row detail).
+LOG_ROW_SAMPLE_EVERY = int(os.environ.get('DJANGO_LOG_ROW_SAMPLE_EVERY', 100))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'verbose': {
+            'format': '{asctime} {levelname} {name} {message}',
+            'style': '{',
+        },
+        'json': {
+            '()': 'se302_project.logutils.JsonFormatter',
+        },
+    },
+    'handlers': {
+        'queue': {
+            'class': 'se302_project.logutils.QueueListenerHandler',
+            'formatter': os.environ.get('DJANGO_LOG_FORMAT', 'verbose'),
+        },
+    },
+    'loggers': {
+        app: {
+            'handlers': ['queue'],
+            'level': os.environ.get(f'DJANGO_LOG_LEVEL_{app.upper()}', LOG_LEVEL),
+            'propagate': False,
+        }
+        for app in LOG_APPS
+    },
+}
+
+
+# Per-request timing and query instrumentation (see se302_project/instrumentation.py).
+# Summaries are served to staff at /metrics/requests/.
+
+REQUEST_METRICS = {
+    'ENABLED': env_flag('DJANGO_REQUEST_METRICS', '0'),
+    'LOG': env_flag('DJANGO_REQUEST_METRICS_LOG', '0'),
+}
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -0,0 +1,114 @@
+"""
+Shared reader for uploaded spreadsheets.
+
+Workbooks are opened in openpyxl's read-only (streaming) mode and CSV files
+are parsed line by line, so memory use does not grow with the sheet size.
+"""
+import codecs
+import csv
+
+import openpyxl
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm')
+CSV_EXTENSIONS = ('.csv',)
+SUPPORTED_EXTENSIONS = EXCEL_EXTENSIONS + CSV_EXTENSIONS
+
+
+class InvalidSpreadsheet(ValueError):
+    """The uploaded sheet as a whole cannot be imported (unreadable file, missing columns)."""
+
+
+class UnsupportedFileType(InvalidSpreadsheet):
+    pass
+
+
+def is_csv(uploaded_file):
+    name = (getattr(uploaded_file, 'name', '') or '').lower()
+    content_type = getattr(uploaded_file, 'content_type', '') or ''
+    return name.endswith(CSV_EXTENSIONS) or content_type in ('text/csv', 'application/csv')
+
+
+def iter_numbered_rows(uploaded_file, min_row=2):
+    """
+    Yield (row_number, row) pairs from the first sheet of an uploaded .xlsx or .csv file.
+    Excel cells keep their types; CSV cells stay text, so numeric columns are
+    converted where they are read (see exams.utils.parse_score). Empty cells
+    become None and completely empty rows are skipped.
+    By default the header row is skipped.
+    """
+    if is_csv(uploaded_file):
+        rows = _iter_csv_rows(uploaded_file)
+    else:
+        rows = _iter_excel_rows(uploaded_file)
+
+    for row_idx, row in enumerate(rows, start=1):
+        if row_idx < min_row or all(value is None for value in row):
+            continue
+        yield row_idx, row
+
+
+def iter_rows(uploaded_file, min_row=2):
+    """Like iter_numbered_rows, without the row numbers."""
+    for _, row in iter_numbered_rows(uploaded_file, min_row=min_row):
+        yield row
+
+
+def iter_sheets(uploaded_file):
+    """
+    Yield (title, rows) for every sheet of an uploaded workbook, where rows yields
+    (row_number, row) pairs like iter_numbered_rows but starting at the header row.
+    A CSV file is a single sheet titled None. Consume each sheet's rows before
+    moving on to the next sheet.
+    """
+    if is_csv(uploaded_file):
+        yield None, _numbered(_iter_csv_rows(uploaded_file))
+        return
+
+    workbook = _load_workbook(uploaded_file)
+    try:
+        for sheet in workbook.worksheets:
+            yield sheet.title, _numbered(sheet.iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+def _numbered(rows):
+    for row_idx, row in enumerate(rows, start=1):
+        if not all(value is None for value in row):
+            yield row_idx, row
+
+
+def read_header(uploaded_file):
+    """Return the first row of the sheet as lower-cased strings, rewinding the file afterwards."""
+    header = next(iter_rows(uploaded_file, min_row=1), ())
+    uploaded_file.seek(0)
+    return [str(value).strip().lower() if value is not None else '' for value in header]
+
+
+def _load_workbook(uploaded_file):
+    uploaded_file.seek(0)
+    try:
+        return openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True)
+    except Exception as e:
+        raise UnsupportedFileType(f"Could not read the uploaded file as an Excel workbook: {e}")
+
+
+def _iter_excel_rows(uploaded_file):
+    workbook = _load_workbook(uploaded_file)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def _iter_csv_rows(uploaded_file):
+    uploaded_file.seek(0)
+    lines = codecs.iterdecode(uploaded_file, 'utf-8-sig')
+    for row in csv.reader(lines):
+        yield tuple(_coerce(value) for value in row)
+
+
+def _coerce(value):
+    value = value.strip()
+    return value if value != '' else None
@@ -0,0 +1,228 @@
+import json
+import logging
+from io import BytesIO
+
+import openpyxl
+from django.contrib.auth.models import User
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.template import Context, Template
+from django.urls import reverse
+
+from .conf import app_setting
+from .instrumentation import QueryCollector, RequestMetricsMiddleware, registry
+from .logutils import ImportLog, JsonFormatter, QueueListenerHandler
+from .pagination import KeysetPaginator, decode_cursor, encode_cursor
+from .spreadsheets import iter_numbered_rows, iter_rows, iter_sheets, read_header, UnsupportedFileType
+
+
+def make_xlsx(rows, name="test.xlsx"):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    content = BytesIO()
+    workbook.save(content)
+    return SimpleUploadedFile(name, content.getvalue())
+
+
+class AppSettingTests(SimpleTestCase):
+    @override_settings(IMPORT_JOBS={'WORKERS': 4})
+    def test_group_keys_fall_back_to_defaults(self):
+        """Test a settings group only needs the keys it changes"""
+        self.assertEqual(app_setting('IMPORT_JOBS', 'WORKERS'), 4)
+        self.assertEqual(app_setting('IMPORT_JOBS', 'LEASE'), 1800)
+        self.assertEqual(app_setting('COURSE_CATALOG', 'TIMEOUT'), 300)
+
+
+class SpreadsheetReaderTests(SimpleTestCase):
+    def test_iter_rows_excel(self):
+        """Test rows are read from a workbook with their types, skipping the header"""
+        upload = make_xlsx([['email', 'midterm'], ['a@example.com', 80], [None, None], ['b@example.com', 72.5]])
+        self.assertEqual(list(iter_numbered_rows(upload)), [(2, ('a@example.com', 80)), (4, ('b@example.com', 72.5))])
+
+    def test_iter_rows_csv(self):
+        """Test CSV cells are read as stripped text and empty cells as None"""
+        upload = SimpleUploadedFile("test.csv", b"\xef\xbb\xbfemail,midterm,final\r\na@example.com, 80,72.5\r\nb@example.com,,x\r\n")
+        self.assertEqual(list(iter_rows(upload)), [('a@example.com', '80', '72.5'), ('b@example.com', None, 'x')])
+
+    def test_csv_text_is_not_coerced_to_numbers(self):
+        """Test names and codes that look like numbers keep their text"""
+        upload = SimpleUploadedFile("test.csv", b"name,code,a,b\r\nNan,0123,1e5,Infinity\r\n")
+        self.assertEqual(list(iter_rows(upload)), [('Nan', '0123', '1e5', 'Infinity')])
+
+    def test_read_header(self):
+        """Test the header is normalized and the file can be read again"""
+        upload = make_xlsx([['Course ID', 'Place'], ['TC101', 'Hall A']])
+        self.assertEqual(read_header(upload), ['course id', 'place'])
+        self.assertEqual(list(iter_rows(upload)), [('TC101', 'Hall A')])
+
+    def test_iter_sheets(self):
+        """Test every tab is read with its title and rows, including the header"""
+        workbook = openpyxl.Workbook()
+        workbook.active.title = 'TC101'
+        workbook.active.append(['num_questions'])
+        workbook.active.append([10])
+        workbook.create_sheet('TC102').append(['num_questions'])
+        buffer = BytesIO()
+        workbook.save(buffer)
+        upload = SimpleUploadedFile("test.xlsx", buffer.getvalue())
+        sheets = [(title, list(rows)) for title, rows in iter_sheets(upload)]
+        self.assertEqual(sheets, [
+            ('TC101', [(1, ('num_questions',)), (2, (10,))]),
+            ('TC102', [(1, ('num_questions',))]),
+        ])
+
+        upload = SimpleUploadedFile("test.csv", b"code,num_questions\r\nTC101,10\r\n")
+        sheets = [(title, list(rows)) for title, rows in iter_sheets(upload)]
+        self.assertEqual(sheets, [(None, [(1, ('code', 'num_questions')), (2, ('TC101', '10'))])])
+
+    def test_invalid_workbook(self):
+        """Test a file that is not a workbook raises UnsupportedFileType"""
+        upload = SimpleUploadedFile("test.xlsx", b"not a workbook")
+        with self.assertRaises(UnsupportedFileType):
+            list(iter_rows(upload))
+
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create(username=f'user{i}') for i in range(7)]
+        self.paginator = KeysetPaginator(User.objects.all(), 3, count_limit=5)
+
+    def test_walk_forward_and_back(self):
+        """Test next and previous cursors walk the listing without gaps"""
+        first = self.paginator.get_page(None)
+        self.assertEqual(list(first), self.users[:3])
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+        second = self.paginator.get_page(first.next_cursor)
+        third = self.paginator.get_page(second.next_cursor)
+        self.assertEqual(list(third), self.users[6:])
+        self.assertFalse(third.has_next())
+
+        back = self.paginator.get_page(third.previous_cursor)
+        self.assertEqual(list(back), self.users[3:6])
+        self.assertEqual(list(self.paginator.get_page(back.previous_cursor)), self.users[:3])
+
+    def test_approximate_count(self):
+        """Test the count stops at count_limit"""
+        page = self.paginator.get_page(None)
+        self.assertEqual(page.count, 5)
+        self.assertFalse(page.count_is_exact)
+
+    def test_malformed_cursor_means_first_page(self):
+        """Test garbage cursors fall back to the first page"""
+        self.assertEqual(decode_cursor('not-a-cursor'), ('next', None))
+        self.assertEqual(list(self.paginator.get_page('!!')), self.users[:3])
+
+    def test_cursor_with_wrong_value_type_means_first_page(self):
+        """Test a well-formed cursor whose value is not an id falls back to the first page"""
+        for value in ('abc', [1], {'id': 1}):
+            page = self.paginator.get_page(encode_cursor('next', value))
+            self.assertEqual(list(page), self.users[:3])
+            self.assertFalse(page.has_previous())
+        response = self.client.get(reverse('insexam'), {'cursor': encode_cursor('next', 'abc')})
+        self.assertEqual(response.status_code, 200)
+
+
+class QuerystringReplaceTests(SimpleTestCase):
+    def test_replace_and_drop(self):
+        """Test filters survive while the cursor is replaced or dropped"""
+        request = RequestFactory().get('/', {'course': 'TC101', 'cursor': 'abc'})
+        template = Template('{% load querystring %}{% querystring_replace cursor="def" %}|{% querystring_replace cursor=None %}')
+        rendered = template.render(Context({'request': request}))
+        self.assertEqual(rendered, '?course=TC101&amp;cursor=def|?course=TC101')
+
+
+METRICS_ENABLED = {'ENABLED': True, 'LOG': False, 'SAMPLE_SIZE': 10, 'DUPLICATE_THRESHOLD': 3, 'SERVER_TIMING': True}
+
+
+@override_settings(REQUEST_METRICS=METRICS_ENABLED)
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        registry.reset()
+
+    def test_middleware_records_requests_per_view(self):
+        """Test wall time, query count and DB time are recorded under the view name"""
+        staff = User.objects.create_user(username='admin', password='adminpass123', is_staff=True)
+        self.client.force_login(staff)
+        with self.settings(REQUEST_METRICS=dict(METRICS_ENABLED, LOG=True)), \
+                self.assertLogs('se302_project.instrumentation', 'INFO') as logs:
+            response = self.client.get(reverse('faculty_payment'))
+        self.assertRegex(response['Server-Timing'], r'^app;dur=[\d.]+, db;dur=[\d.]+$')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record['view'], record['status']), ('faculty_payment', 200))
+        self.assertGreater(record['queries'], 0)
+
+        data = self.client.get(reverse('request_metrics')).json()
+        self.assertEqual(data['views']['faculty_payment']['requests'], 1)
+        self.assertEqual(data['views']['faculty_payment']['queries']['p50'], record['queries'])
+        self.assertEqual(set(data['views']['faculty_payment']['wall_ms']), {'p50', 'p95', 'p99', 'max'})
+
+    def test_repeated_statements_flagged(self):
+        """Test a statement repeated within one request counts as a likely N+1"""
+        users = [User.objects.create_user(username=f'user{i}') for i in range(3)]
+        collector = QueryCollector()
+        with connection.execute_wrapper(collector):
+            for user in users:
+                User.objects.get(id=user.id)
+            User.objects.count()
+        self.assertEqual(collector.count, 4)
+        self.assertEqual(list(collector.duplicates(3).values()), [3])
+
+    def test_metrics_endpoint_is_staff_only(self):
+        """Test non-staff users are sent to the admin login"""
+        self.client.force_login(User.objects.create_user(username='student'))
+        response = self.client.get(reverse('request_metrics'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_disabled_middleware_is_not_used(self):
+        """Test the middleware removes itself when metrics are disabled"""
+        with override_settings(REQUEST_METRICS={'ENABLED': False}):
+            with self.assertRaises(MiddlewareNotUsed):
+                RequestMetricsMiddleware(lambda request: None)
+
+
+class LoggingTests(SimpleTestCase):
+    def test_import_log_samples_rows_and_summarizes(self):
+        """Test every Nth row is logged at DEBUG and one summary record is written"""
+        logger = logging.getLogger('se302_project.tests.import')
+        with self.settings(LOG_ROW_SAMPLE_EVERY=10), self.assertLogs(logger, 'DEBUG') as logs:
+            with ImportLog(logger, 'grades', course='SE302') as log:
+                for row_idx in range(2, 27):
+                    log.row(row_idx, ('a@example.com', 80))
+                log.errors = ['Row 5: bad']
+        debug = [r for r in logs.records if r.levelno == logging.DEBUG]
+        self.assertEqual([r.args[1] for r in debug], [2, 12, 22])
+        summary = logs.records[-1]
+        self.assertEqual((summary.rows, summary.errors, summary.course), (25, 1, 'SE302'))
+        self.assertGreater(summary.rows_per_sec, 0)
+
+    def test_import_log_records_failures(self):
+        """Test an import that raises is summarized at ERROR and the exception propagates"""
+        logger = logging.getLogger('se302_project.tests.import')
+        with self.assertLogs(logger, 'INFO') as logs, self.assertRaises(ValueError):
+            with ImportLog(logger, 'students') as log:
+                log.row(2, ())
+                raise ValueError('Incomplete data')
+        self.assertEqual(logs.records[-1].levelno, logging.ERROR)
+        self.assertEqual(logs.records[-1].rows, 1)
+
+    def test_queue_handler_drops_when_full(self):
+        """Test a full queue drops records instead of blocking the caller"""
+        handler = QueueListenerHandler(handlers=['logging.NullHandler'], queue_size=1)
+        handler.close()
+        record = logging.LogRecord('x', logging.INFO, __file__, 1, 'msg', (), None)
+        handler.handle(record)
+        handler.handle(record)
+        self.assertEqual(handler.dropped, 1)
+
+    def test_json_formatter_includes_extra_fields(self):
+        """Test structured fields passed via extra end up in the JSON record"""
+        record = logging.LogRecord('exams.importers', logging.INFO, __file__, 1, 'done %s', ('x',), None)
+        record.rows = 3
+        payload = json.loads(JsonFormatter().format(record))
+        self.assertEqual((payload['message'], payload['rows'], payload['logger']), ('done x', 3, 'exams.importers'))
@@ -19,11 +19,15 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .instrumentation import request_metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('declarations/', include('declarations.urls')),
     path('exams/', include('exams.urls')),
     path('courses/', include('courses.urls')),  # this line connects root URL to courses app
+    path('jobs/', include('jobs.urls')),
+    path('metrics/requests/', request_metrics, name='request_metrics'),
     path('', include('users.urls')),
     path('users/', include('users.urls')),
 ]+ static(settings.STATIC_URL, document_root=settings.STATICFILES_DIRS[0])
@@ -37,10 +37,11 @@ function postAnnouncement() {
 document.querySelector(".publish").addEventListener("click", postAnnouncement);
 
 
-function uploadFile() {
-    const fileInput = document.getElementById('scheduleFile');
-    const filePreview = document.getElementById('filePreview');
-    const confirmationMsg = document.getElementById('confirmationMsg');
+function uploadFile(inputId = 'scheduleFile', uploadUrl = document.querySelector('main').dataset.uploadUrl,
+                    previewId = 'filePreview', confirmationId = 'confirmationMsg') {
+    const fileInput = document.getElementById(inputId);
+    const filePreview = document.getElementById(previewId);
+    const confirmationMsg = document.getElementById(confirmationId);
     const file = fileInput.files[0];
   
     if (!file) {
@@ -55,7 +56,6 @@ function uploadFile() {
     formData.append('excel_file', file);
   
     const csrfToken = document.querySelector('input[name="csrfmiddlewaretoken"]').value;
-    const uploadUrl = document.querySelector('main').dataset.uploadUrl;
   
     fetch(uploadUrl, {
       method: 'POST',
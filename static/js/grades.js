@@ -113,7 +113,7 @@ function uploadResitExcel(courseId) {
       method: 'POST',
       body: formData,
       headers: {
-        'X-CSRFToken': form.querySelector('input[name="csrfmiddlewaretoken"]').value,
+        'X-CSRFToken': csrftoken,
       },
     })
     .then(response => response.json())
@@ -0,0 +1,15 @@
+"""
+Setup of the processes users.utils.hash_passwords hashes in. Spawned processes
+import this module before Django is set up, so it must not import models.
+"""
+import os
+
+import django
+from django.conf import settings
+
+
+def init_hash_worker(settings_module, password_hashers):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+    # Hash with the hashers of the parent, including overrides made at runtime.
+    settings.PASSWORD_HASHERS = password_hashers
@@ -0,0 +1,39 @@
+"""
+Student account imports, shared by the upload view and the background import jobs.
+"""
+import logging
+
+from se302_project.logutils import ImportLog
+from se302_project.spreadsheets import iter_numbered_rows
+from .utils import bulk_create_student_accounts
+
+logger = logging.getLogger(__name__)
+
+
+def import_students(uploaded_file, progress=None):
+    """
+    Create a student account for every (email, name, program) row of the sheet.
+    Returns the created students and a per-row list of skipped rows.
+    Accounts are provisioned in bulk, see bulk_create_student_accounts.
+    """
+    rows = []
+    errors = []
+    with ImportLog(logger, 'students') as log:
+        for count, (row_idx, row) in enumerate(iter_numbered_rows(uploaded_file), start=1):
+            log.row(row_idx, row)
+            if progress:
+                progress(count)
+            if len(row) < 3:
+                errors.append(f"Row {row_idx}: Incomplete data in row: {row}")
+                continue
+            email, name, program = row[:3]
+            rows.append((row_idx, email, name, program))
+
+        created_students, row_errors = bulk_create_student_accounts(rows)
+        errors += row_errors
+        log.errors = errors
+    return {'students': created_students, 'errors': errors}
+
+
+def run_import_job(uploaded_file, params, progress):
+    return import_students(uploaded_file, progress)
@@ -0,0 +1,88 @@
+"""
+Role (group) resolution with per-session caching.
+
+A user's group names are loaded with one query, then kept on the request and
+in the session so later requests and guards don't repeat membership queries.
+Sessions are flushed on login as a different user, and the cached roles are
+refreshed on every login and after ROLE_CACHE_SECONDS.
+"""
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.views import redirect_to_login
+from django.http import JsonResponse
+from django.shortcuts import redirect
+
+SESSION_KEY = '_user_roles'
+
+# Landing page per role, in the order login_view checks them.
+ROLE_HOME_PAGES = [
+    ('student', 'student_page'),
+    ('instructor', 'instructor_page'),
+    ('faculty', 'faculty_page'),
+]
+
+
+def get_user_roles(request, refresh=False):
+    """Return the lower-cased group names of request.user as a frozenset."""
+    user = request.user
+    if not user.is_authenticated:
+        return frozenset()
+
+    cached = getattr(request, '_user_roles', None)
+    if cached is not None and not refresh:
+        return cached
+
+    entry = request.session.get(SESSION_KEY)
+    max_age = getattr(settings, 'ROLE_CACHE_SECONDS', 300)
+    if (
+        refresh
+        or not entry
+        or entry.get('user_id') != user.pk
+        or time.time() - entry.get('loaded_at', 0) > max_age
+    ):
+        names = sorted({name.lower() for name in user.groups.values_list('name', flat=True)})
+        entry = {'user_id': user.pk, 'roles': names, 'loaded_at': time.time()}
+        request.session[SESSION_KEY] = entry
+
+    request._user_roles = frozenset(entry['roles'])
+    return request._user_roles
+
+
+def has_role(request, role):
+    return role.lower() in get_user_roles(request)
+
+
+def home_page_for(request):
+    """URL name of the landing page for the user's role, or None if the user has no role."""
+    roles = get_user_roles(request)
+    for role, url_name in ROLE_HOME_PAGES:
+        if role in roles:
+            return url_name
+    return None
+
+
+def role_required(*roles, redirect_to=None, message=None):
+    """
+    Allow the view only for users holding one of `roles`.
+    Anonymous users go to the login page. Other users get a JSON 403, or are
+    redirected to `redirect_to` (with `message` flashed) when it is given.
+    """
+    wanted = {role.lower() for role in roles}
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not request.user.is_authenticated:
+                return redirect_to_login(request.get_full_path())
+            if wanted & get_user_roles(request):
+                return view_func(request, *args, **kwargs)
+            if redirect_to:
+                if message:
+                    messages.error(request, message)
+                return redirect(redirect_to)
+            return JsonResponse({'status': 'error', 'message': message or 'Unauthorized access.'}, status=403)
+        return wrapper
+    return decorator
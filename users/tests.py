@@ -1,3 +1,123 @@
-from django.test import TestCase
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+import openpyxl
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.models import Group, User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import StudentProfile
+from .roles import get_user_roles, role_required
+from .utils import PARALLEL_HASH_PER_WORKER, bulk_create_student_accounts, create_student_account, hash_passwords
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class BulkStudentAccountTests(TestCase):
+    def test_bulk_create_student_accounts(self):
+        """Test accounts, group memberships and profiles are created in bulk"""
+        create_student_account('taken@example.com', 'Taken Student', 'SE')
+        created, errors = bulk_create_student_accounts([
+            (2, 'ayse@example.com', 'Ayse Nur Yilmaz', 'SE'),
+            (3, 'taken@example.com', 'Taken Again', 'SE'),
+            (4, 'ayse@example.com', 'Ayse Again', 'CE'),
+            (5, '', 'No Email', 'CE'),
+            (6, 'mehmet@example.com', 'Mehmet', 'CE'),
+        ], workers=1)
+
+        self.assertEqual([student['email'] for student in created], ['ayse@example.com', 'mehmet@example.com'])
+        self.assertEqual(len(errors), 3)
+        self.assertIn('Row 3: Student already exists', errors)
+        user = User.objects.get(username='ayse@example.com')
+        self.assertEqual((user.first_name, user.last_name), ('Ayse', 'Nur Yilmaz'))
+        self.assertTrue(user.groups.filter(name='student').exists())
+        profile = StudentProfile.objects.get(user=user)
+        self.assertEqual(profile.program, 'SE')
+        self.assertTrue(check_password(profile.generated_password, user.password))
+
+    def test_bulk_create_query_count_is_constant(self):
+        """Test provisioning does not issue queries per student"""
+        Group.objects.create(name='student')
+        rows = [(i, f's{i}@example.com', f'Student {i}', 'SE') for i in range(30)]
+        # existing users, savepoint, users, group lookup, memberships, profiles, release
+        with self.assertNumQueries(7):
+            created, errors = bulk_create_student_accounts(rows, workers=1)
+        self.assertEqual(len(created), 30)
+        self.assertEqual(errors, [])
+
+    def test_bulk_create_hashes_in_process_pool(self):
+        """Test passwords hashed in worker processes are valid and use the configured hasher"""
+        created, _ = bulk_create_student_accounts(
+            [(i, f'p{i}@example.com', f'Pool {i}', 'SE') for i in range(2 * PARALLEL_HASH_PER_WORKER)],
+            workers=2,
+        )
+        for student in created:
+            user = User.objects.get(username=student['email'])
+            self.assertTrue(user.password.startswith('md5$'))
+            self.assertTrue(user.check_password(student['password']))
+
+    def test_small_batches_are_hashed_without_a_pool(self):
+        """Test a batch below the per-worker threshold does not start worker processes"""
+        with mock.patch('users.utils.ProcessPoolExecutor') as pool:
+            hashes = hash_passwords(['a', 'b', 'c'], workers=2)
+        pool.assert_not_called()
+        self.assertTrue(check_password('b', hashes[1]))
+
+    def test_upload_excel_students(self):
+        """Test the upload view reports created students and skipped rows"""
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(['email', 'name', 'program'])
+        sheet.append(['new@example.com', 'New Student', 'SE'])
+        sheet.append(['new@example.com', 'New Student', 'SE'])
+        content = BytesIO()
+        workbook.save(content)
+        response = self.client.post(
+            reverse('upload_excel_students'),
+            {'file': SimpleUploadedFile('students.xlsx', content.getvalue())},
+        )
+        data = response.json()
+        self.assertEqual(data['status'], 'success')
+        self.assertEqual(len(data['students']), 1)
+        self.assertEqual(data['errors'], ['Row 3: Duplicate email in sheet: new@example.com'])
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class RoleTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='faculty@example.com', email='faculty@example.com', password='facultypass123')
+        self.user.groups.add(Group.objects.create(name='Faculty'))
+
+    def test_login_redirects_by_role(self):
+        """Test login resolves the landing page from one group query"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('login'), {'email': 'Faculty@example.com', 'password': 'facultypass123'})
+        self.assertEqual(len([q for q in queries if 'auth_user_groups' in q['sql']]), 1)
+        self.assertRedirects(response, reverse('faculty_page'))
+        self.assertEqual(self.client.session['_user_roles']['roles'], ['faculty'])
+
+    def test_roles_cached_in_session(self):
+        """Test guarded views reuse the roles stored in the session"""
+        self.client.post(reverse('login'), {'email': 'faculty@example.com', 'password': 'facultypass123'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('upload_resit_schedule'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(queries.captured_queries)
+        self.assertFalse([q for q in queries if 'auth_user_groups' in q['sql']])
+
+    def test_role_required_denies_other_roles(self):
+        """Test role_required answers 403 (or redirects) for users without the role"""
+        view = role_required('student')(lambda request: HttpResponse('ok'))
+        redirecting_view = role_required('student', redirect_to='faculty_page')(lambda request: HttpResponse('ok'))
+        request = RequestFactory().get('/')
+        request.user = self.user
+        request.session = self.client.session
+        self.assertEqual(view(request).status_code, 403)
+        self.assertEqual(redirecting_view(request).status_code, 302)
+        self.assertEqual(get_user_roles(request), frozenset(['faculty']))
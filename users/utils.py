@@ -1,8 +1,20 @@
 # utils.py
+import multiprocessing
+import os
 import string, random
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User, Group
+from django.db import transaction
+from django.db.models import Q
+from .hash_worker import init_hash_worker
 from .models import StudentProfile  
 
+# Fewer passwords per worker than this are hashed serially.
+PARALLEL_HASH_PER_WORKER = 8
+
 def generate_password(length=8):
     return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
 
@@ -11,8 +23,7 @@ def create_student_account(email, name, program):
         return None, "Student already exists"
 
     password = generate_password()
-    first_name, *last_name_parts = name.strip().split()
-    last_name = " ".join(last_name_parts) if last_name_parts else ""
+    first_name, last_name = split_name(name)
 
     user = User.objects.create_user(
         username=email,
@@ -37,3 +48,102 @@ def create_student_account(email, name, program):
         "program": program,
         "password": password,
     }, None
+
+
+def split_name(name):
+    first_name, *last_name_parts = name.strip().split()
+    return first_name, " ".join(last_name_parts)
+
+def bulk_create_student_accounts(rows, workers=None):
+    """
+    Create many student accounts at once.
+    `rows` yields (row_number, email, name, program) tuples. Existing and repeated
+    emails are found with one query, passwords are hashed across a process pool,
+    and users, group memberships and profiles are inserted in bulk in one
+    transaction. Returns (created_students, errors) with one error per skipped row.
+    """
+    errors = []
+    candidates = []
+    seen = set()
+    for row_idx, email, name, program in rows:
+        email = str(email or '').strip()
+        name = str(name or '').strip()
+        if not email or not name:
+            errors.append(f"Row {row_idx}: Email and name are required")
+            continue
+        if email in seen:
+            errors.append(f"Row {row_idx}: Duplicate email in sheet: {email}")
+            continue
+        seen.add(email)
+        candidates.append((row_idx, email, name, str(program or '').strip()))
+
+    existing = set()
+    for user_email, username in User.objects.filter(Q(email__in=seen) | Q(username__in=seen)).values_list('email', 'username'):
+        existing.update((user_email, username))
+
+    accounts = []
+    for row_idx, email, name, program in candidates:
+        if email in existing:
+            errors.append(f"Row {row_idx}: Student already exists")
+            continue
+        accounts.append((email, name, program, generate_password()))
+
+    hashes = hash_passwords([password for *_, password in accounts], workers)
+
+    users = []
+    for (email, name, program, _), password_hash in zip(accounts, hashes):
+        first_name, last_name = split_name(name)
+        users.append(User(
+            username=email,
+            email=email,
+            password=password_hash,
+            first_name=first_name,
+            last_name=last_name,
+        ))
+
+    with transaction.atomic():
+        users = User.objects.bulk_create(users, batch_size=500)
+        student_group, _ = Group.objects.get_or_create(name='student')
+        User.groups.through.objects.bulk_create(
+            [User.groups.through(user_id=user.id, group_id=student_group.id) for user in users],
+            batch_size=500,
+        )
+        StudentProfile.objects.bulk_create(
+            [
+                StudentProfile(user=user, program=program, generated_password=password)
+                for user, (_, _, program, password) in zip(users, accounts)
+            ],
+            batch_size=500,
+        )
+
+    created_students = [
+        {"email": email, "name": name, "program": program, "password": password}
+        for email, name, program, password in accounts
+    ]
+    return created_students, errors
+
+def hash_passwords(passwords, workers=None):
+    """
+    Hash passwords with the default hasher. Batches of at least
+    PARALLEL_HASH_PER_WORKER passwords per worker are spread over a pool of
+    spawned processes; smaller ones are hashed here, which is faster than
+    starting the pool.
+    """
+    if workers is None:
+        workers = getattr(settings, 'PASSWORD_HASH_WORKERS', os.cpu_count() or 1)
+    if workers <= 1 or len(passwords) < workers * PARALLEL_HASH_PER_WORKER:
+        return [make_password(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (workers * 4))
+    # Spawned, not forked: the web server, import workers and log listener run
+    # threads, and a forked child could inherit a lock one of them holds.
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_hash_worker,
+        initargs=(
+            os.environ.get('DJANGO_SETTINGS_MODULE', 'se302_project.settings'),
+            list(settings.PASSWORD_HASHERS),
+        ),
+    ) as pool:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
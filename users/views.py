@@ -7,12 +7,15 @@ from django.contrib.auth.decorators import login_required
 import random
 import string
 from django.http import JsonResponse
-import openpyxl
-from courses.models import Announcement
+from courses.feeds import get_dashboard_feed
 from users.utils import create_student_account
 from .models import StudentProfile
 from django.views.decorators.csrf import csrf_exempt
-from django.core.paginator import Paginator
+from se302_project.pagination import DEFAULT_COUNT_LIMIT, KeysetPaginator
+from jobs.views import job_accepted_response
+from jobs.worker import enqueue_import, wants_async
+from .importers import import_students
+from .roles import get_user_roles, home_page_for
 
 
 @csrf_exempt  # Remove in production
@@ -38,18 +41,13 @@ def add_student(request):
 def upload_excel_students(request):
     if request.method == "POST" and request.FILES.get("file"):
         excel_file = request.FILES["file"]
-        wb = openpyxl.load_workbook(excel_file)
-        ws = wb.active
 
-        created_students = []
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            email, name, program = row
-            student_data, error = create_student_account(email, name, program)
-            if student_data:
-                created_students.append(student_data)
-            # Optionally log errors for duplicates
+        if wants_async(request):
+            job = enqueue_import('students', excel_file, user=request.user)
+            return job_accepted_response(job)
 
-        return JsonResponse({"status": "success", "students": created_students})
+        result = import_students(excel_file)
+        return JsonResponse({"status": "success", "students": result["students"], "errors": result["errors"]})
 
     return JsonResponse({"status": "error", "message": "Invalid request"})
 
@@ -80,13 +78,11 @@ def login_view(request):
         if user:
             login(request, user)
 
-            # Check user's group to redirect
-            if user.groups.filter(name__iexact='student').exists():
-                return redirect('student_page')
-            elif user.groups.filter(name__iexact='instructor').exists():
-                return redirect('instructor_page')
-            elif user.groups.filter(name__iexact='faculty').exists():
-                return redirect('faculty_page')
+            # Load the user's roles once (cached in the session) and redirect by group
+            get_user_roles(request, refresh=True)
+            home_page = home_page_for(request)
+            if home_page:
+                return redirect(home_page)
             else:
                 return render(request, 'index.html', {'error': 'User has no group assigned.'})
 
@@ -98,14 +94,14 @@ def login_view(request):
 
 @login_required
 def student_page(request):
-    announcements = Announcement.objects.order_by('-created_at')  # Or [:3] if you want a few
+    announcements = get_dashboard_feed('all')
     return render(request, 'studentpage.html', {
         'announcements': announcements
          })
 
 @login_required
 def instructor_page(request):
-    announcements = Announcement.objects.filter(posted_by__groups__name='faculty').order_by('-created_at')
+    announcements = get_dashboard_feed('faculty')
     return render(request, 'instroctorpage.html', {
         'announcements': announcements
          })
@@ -117,11 +113,10 @@ def faculty_page(request):
 
 def faculty_payment(request):
     students = StudentProfile.objects.select_related('user').all()
-    page_number = request.GET.get('page', 1)
     per_page = 5  # Or allow request.GET.get('per_page', 10) to be dynamic
 
-    paginator = Paginator(students, per_page)
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(students, per_page, count_limit=DEFAULT_COUNT_LIMIT)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
 
     context = {
         'students': page_obj.object_list,